@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless batch computation of the tradeoff between mismatch queries and post-processing.
+
+Every combination of a version of Kyber and a value of costPerKey is optimized in a worker process, and
+the curves are written to a CSV or Parquet file with one row per (scheme, costPerKey, number of queries).
+Plotting is an optional last step. Example:
+
+    python BatchTradeoff.py --schemes Kyber768 Kyber1024 --cost-per-key 2**10 2**15 2**20 \\
+        --queries 0:60 --output curves.csv --plot figures
+"""
+
+import argparse
+import csv
+import dataclasses
+import math
+import os
+from multiprocessing import Pool
+
+from KyberSchemes import schemes
+from TradeoffOptimizer import optimizeSchemes
+
+COLUMNS = ["scheme", "costPerKey", "log2CostPerKey", "queries", "cost", "p", "recovered", "strategy"]
+
+
+# A cost per key given as an integer, 2**k or 2^k
+def parseCostPerKey(value):
+    for separator in ("**", "^"):
+        if separator in value:
+            base, exponent = value.split(separator)
+            return int(base)**int(exponent)
+    return int(value)
+
+
+# A range of query budgets "highest", "lowest:highest" or "lowest:highest:step", including highest
+def parseQueryRange(value):
+    bounds = [int(bound) for bound in value.split(":")]
+    if len(bounds) == 1:
+        bounds = [0] + bounds
+    if len(bounds) == 2:
+        bounds.append(1)
+    lowest, highest, step = bounds
+    return range(lowest, highest + 1, step)
+
+
+def _optimizeCurve(args):
+    schemeName, costPerKey, queries, postProcessing = args
+    scheme = dataclasses.replace(schemes[schemeName], postProcessing=postProcessing)
+    tradeoff = optimizeSchemes([scheme], queries, costPerKey, validate=False)[schemeName] # See batchTradeoff
+    return [{"scheme": schemeName, "costPerKey": costPerKey, "log2CostPerKey": math.log2(costPerKey),
+             "queries": int(q), "cost": float(cost), "p": int(p), "recovered": int(recovered), "strategy": strategy}
+            for q, cost, p, recovered, strategy in zip(tradeoff["queries"], tradeoff["cost"], tradeoff["p"],
+                                                       tradeoff["recovered"], tradeoff["strategy"])]
+
+
+# Optimize every combination of scheme and costPerKey for the given query budgets, using jobs processes
+# (default: all cores). postProcessing selects the security level tables, e.g. "bdd" or "best".
+# Returns a list of rows with the columns in COLUMNS.
+def batchTradeoff(schemeNames, costsPerKey, queries, jobs=None, postProcessing="bdd"):
+    queries = sorted(set(queries))
+    tasks = [(schemeName, costPerKey, queries, postProcessing) for schemeName in schemeNames
+             for costPerKey in costsPerKey]
+    if not tasks:
+        return []
+    for schemeName in schemeNames: # Once here instead of in every worker
+        schemes[schemeName].validateGroupSizes()
+    with Pool(min(jobs or os.cpu_count(), len(tasks))) as pool:
+        return [row for rows in pool.imap(_optimizeCurve, tasks) for row in rows]
+
+
+# Write the rows to a CSV file, or a Parquet file if the file name ends with .parquet (requires pandas)
+def writeCurves(rows, output):
+    if output.endswith(".parquet"):
+        import pandas as pd
+        frame = pd.DataFrame(rows, columns=COLUMNS)
+        frame["costPerKey"] = frame["costPerKey"].astype(str) # May not fit in 64 bits
+        frame.to_parquet(output, index=False)
+        return
+    with open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# Save one figure per scheme to directory, with one curve per costPerKey
+def plotCurves(rows, directory):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    for schemeName in dict.fromkeys(row["scheme"] for row in rows):
+        plt.figure()
+        curves = {}
+        for row in rows:
+            if row["scheme"] == schemeName:
+                curves.setdefault(row["log2CostPerKey"], []).append(row)
+        for log2CostPerKey, curve in curves.items():
+            plt.plot([row["queries"] for row in curve], [row["cost"] for row in curve], '*',
+                     label=f"costPerKey = 2^{log2CostPerKey:g}")
+        plt.xlabel('Number of queries')
+        plt.ylabel('Bit complexity')
+        plt.title(schemeName)
+        plt.legend()
+        plt.savefig(os.path.join(directory, f"{schemeName}.png"))
+        plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--schemes", nargs="+", choices=list(schemes), default=list(schemes),
+                        help="versions of Kyber (default: all)")
+    parser.add_argument("--cost-per-key", nargs="+", type=parseCostPerKey, default=[2**15],
+                        help="costs per key, e.g. 32768 or 2**15 (default: 2**15)")
+    parser.add_argument("--queries", nargs="+", type=parseQueryRange, default=[range(61)],
+                        help="ranges of query budgets, e.g. 40, 0:60 or 0:60:5 (default: 0:60)")
+    parser.add_argument("--post-processing", default="bdd",
+                        help="post-processing algorithm of the security level tables, or best (default: bdd)")
+    parser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--output", default="tradeoff.csv", help="CSV or .parquet file (default: tradeoff.csv)")
+    parser.add_argument("--plot", metavar="DIRECTORY", default=None, help="also save one figure per scheme")
+    args = parser.parse_args(argv)
+
+    queries = [q for queryRange in args.queries for q in queryRange]
+    rows = batchTradeoff(args.schemes, args.cost_per_key, queries, args.jobs, args.post_processing)
+    writeCurves(rows, args.output)
+    if args.plot is not None:
+        plotCurves(rows, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmarks of the simulator, the local Kyber oracle, the tradeoff optimizer and the security
+level tables, and the number of evaluations of warm-started security level sweeps.
+
+Every run appends its results to a history file, one JSON object per line with the time, the commit and
+the platform. The results are compared against a stored baseline, and every benchmark that is slower by
+more than the tolerance is flagged as a regression, in which case the exit status is 1. Example:
+
+    python Benchmarks.py --save-baseline       # on the reference version
+    python Benchmarks.py                        # after a change
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(PACKAGE_DIR, "data", "benchmarks")
+HISTORY_FILE = os.path.join(BENCHMARK_DIR, "history.jsonl")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+
+# The shortest of repeat timings of f, in seconds
+def bestTime(f, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def result(name, value, unit, higherIsBetter=True):
+    return {"name": name, "value": value, "unit": unit, "higherIsBetter": higherIsBetter}
+
+
+# Simulated trials per second for every p in pValues
+def benchmarkSimulation(repeat, eta=2, pValues=(1, 16, 128), trials=2000):
+    from MismatchSimulator import simulateTrials
+
+    results = []
+    for p in pValues:
+        rng = np.random.default_rng(0)
+        seconds = bestTime(lambda: simulateTrials(rng, eta, p, trials), repeat)
+        results.append(result(f"simulation/eta{eta}/p{p}", trials/seconds, "trials/s"))
+    return results
+
+
+# Mismatch oracle queries per second for every scheme, each query asked to all keys at once
+def benchmarkOracle(repeat, schemes=("Kyber512", "Kyber1024"), keys=1000):
+    from KyberOracle import PARAMETERS, MismatchOracle, keyGen, thresholdCiphertexts
+
+    results = []
+    for scheme in schemes:
+        parameters = PARAMETERS[scheme]
+        rng = np.random.default_rng(0)
+        oracle = MismatchOracle(parameters, keyGen(rng, parameters, keys)[2])
+        thresholds = rng.integers(-parameters.eta1, parameters.eta1 + 1, size=(keys, 256))
+        u, v, messages = thresholdCiphertexts(parameters, 0, thresholds)
+        seconds = bestTime(lambda: oracle(u, v, messages), repeat)
+        results.append(result(f"oracle/{scheme}", keys/seconds, "queries/s"))
+    return results
+
+
+# Grid points (scheme, query budget, p, strategy) of the tradeoff optimizer evaluated per second
+def benchmarkTradeoffGrid(repeat, queries=range(61), costPerKey=2**15):
+    from KyberSchemes import kyber512, kyber768, kyber1024
+    from SecurityLevels import loadSecurityLevels
+    from TradeoffOptimizer import optimizeSchemes
+
+    schemes = [kyber512, kyber768, kyber1024]
+    tables = {(scheme.securityLevelTable, scheme.postProcessing): loadSecurityLevels(scheme.securityLevelTable)
+              for scheme in schemes}
+    strategies = 3 + max(scheme.maxGroupSize for scheme in schemes) # twoQuery, onePosition, groups, adaptive
+    points = len(schemes)*len(queries)*256*strategies
+    seconds = bestTime(lambda: optimizeSchemes(schemes, queries, costPerKey, dict(tables)), repeat)
+    return [result("tradeoffGrid", points/seconds, "points/s")]
+
+
+# Seconds per n of the estimation of the post-processing cost. Requires Sage, skipped otherwise.
+def benchmarkSecurityLevels(repeat, nValues=(400, 401, 402)):
+    try:
+        from estimator import Logging, schemes
+    except ImportError:
+        return []
+    from SecurityLevels import estimateSecurityLevels
+
+    Logging.set_level(Logging.LEVEL0)
+    seconds = bestTime(lambda: estimateSecurityLevels(schemes.Kyber512, nValues), repeat)
+    return [result("securityLevels/Kyber512", seconds/len(nValues), "s/n", higherIsBetter=False)]
+
+
+# Evaluations per n of all searches of a sweep over nValues for the post-processing cost, without and
+# with warm starts. Requires Sage, skipped otherwise.
+def benchmarkWarmStart(repeat, nValues=range(400, 416)):
+    try:
+        from estimator import Logging, schemes
+        from estimator.util import evaluation_counts
+    except ImportError:
+        return []
+    from SecurityLevels import estimateSecurityLevels
+
+    Logging.set_level(Logging.LEVEL0)
+    results = []
+    for warmStart in (False, True):
+        evaluation_counts(reset=True)
+        estimateSecurityLevels(schemes.Kyber512, nValues, warmStart)
+        evaluated = sum(counts["evaluated"] for counts in evaluation_counts().values())
+        results.append(result(f"warmStart/{'warm' if warmStart else 'cold'}", evaluated/len(nValues),
+                              "evaluations/n", higherIsBetter=False))
+    return results
+
+
+BENCHMARKS = {"simulation": benchmarkSimulation, "oracle": benchmarkOracle, "tradeoffGrid": benchmarkTradeoffGrid,
+              "securityLevels": benchmarkSecurityLevels, "warmStart": benchmarkWarmStart}
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PACKAGE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runBenchmarks(names=tuple(BENCHMARKS), repeat=3):
+    results = []
+    for name in names:
+        results += BENCHMARKS[name](repeat)
+    return {"time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), "commit": commit(),
+            "platform": platform.platform(), "python": platform.python_version(), "numpy": np.__version__,
+            "results": results}
+
+
+def appendHistory(run, historyFile=HISTORY_FILE):
+    os.makedirs(os.path.dirname(historyFile), exist_ok=True)
+    with open(historyFile, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+def readHistory(historyFile=HISTORY_FILE):
+    if not os.path.exists(historyFile):
+        return []
+    with open(historyFile) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def saveBaseline(run, baselineFile=BASELINE_FILE):
+    os.makedirs(os.path.dirname(baselineFile), exist_ok=True)
+    with open(baselineFile + ".tmp", "w") as f:
+        json.dump(run, f, indent=1)
+    os.replace(baselineFile + ".tmp", baselineFile)
+
+
+# The results of run that are worse than in baseline by more than the fraction tolerance, as
+# (result, baseline value, relative change). Benchmarks missing from either run are skipped.
+def findRegressions(run, baseline, tolerance=0.2):
+    baselineValues = {r["name"]: r["value"] for r in baseline["results"]}
+    regressions = []
+    for r in run["results"]:
+        if r["name"] not in baselineValues:
+            continue
+        change = r["value"]/baselineValues[r["name"]] - 1
+        if (change < -tolerance) if r["higherIsBetter"] else (change > tolerance):
+            regressions.append((r, baselineValues[r["name"]], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timings per benchmark, the best counts (default: 3)")
+    parser.add_argument("--history", default=HISTORY_FILE, help="history file the results are appended to")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative slowdown flagged as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    run = runBenchmarks(args.only, args.repeat)
+    appendHistory(run, args.history)
+    for r in run["results"]:
+        print(f"{r['name']:32} {r['value']:14.6g} {r['unit']}")
+
+    if args.save_baseline:
+        saveBaseline(run, args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline in {args.baseline}, store one with --save-baseline.")
+        return 0
+    with open(args.baseline) as f:
+        regressions = findRegressions(run, json.load(f), args.tolerance)
+    for r, baselineValue, change in regressions:
+        print(f"REGRESSION {r['name']}: {r['value']:.6g} {r['unit']} vs {baselineValue:.6g} ({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
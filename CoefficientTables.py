@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Results of the simulations of the mismatch attack: the expected number of coefficients recovered per query
+for p = 1, 2, ... positions queried in parallel.
+
+The tables are kept in a small store, one binary array per (scheme, strategy, recovery), listed in an
+index file. The strategies are "adaptive" (optimized for the average case) and "adaptiveWorst" (optimized
+for the worst case and thereafter for the average case). The recovery is "partial" or "full" key recovery.
+Tables are only read when they are first requested.
+"""
+
+import functools
+import json
+import os
+
+import numpy as np
+
+COEFF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "coeffPerQuery")
+
+RECOVERIES = ("partial", "full")
+
+
+def readIndex(directory=COEFF_DIR):
+    path = os.path.join(directory, "index.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+# Store the coefficients per query for p = 1, 2, ... in the table store
+def saveCoeffPerQuery(coeffPerQuery, scheme, strategy="adaptive", recovery="partial", directory=COEFF_DIR,
+                      metadata=None):
+    if recovery not in RECOVERIES:
+        raise ValueError(f"Unknown recovery '{recovery}', expected one of {RECOVERIES}.")
+    entry = {"scheme": scheme, "strategy": strategy, "recovery": recovery, "highestP": len(coeffPerQuery)}
+    if metadata is not None:
+        entry.update(metadata)
+    entry["file"] = "{scheme}-{strategy}-{recovery}.npy".format(**entry)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, entry["file"]), np.asarray(coeffPerQuery, dtype=np.float64))
+
+    index = [e for e in readIndex(directory) if e["file"] != entry["file"]]
+    index.append(entry)
+    path = os.path.join(directory, "index.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(path + ".tmp", path)
+    loadCoeffPerQuery.cache_clear()
+    return entry
+
+
+# The coefficients per query for p = 1, 2, ..., as a read-only array. Every table is read once.
+@functools.lru_cache(maxsize=None)
+def loadCoeffPerQuery(scheme, strategy="adaptive", recovery="partial", directory=COEFF_DIR):
+    for entry in readIndex(directory):
+        if (entry["scheme"], entry["strategy"], entry["recovery"]) == (scheme, strategy, recovery):
+            coeffPerQuery = np.load(os.path.join(directory, entry["file"]))
+            coeffPerQuery.flags.writeable = False
+            return coeffPerQuery
+    raise KeyError(f"No coefficients per query for {scheme} with the {strategy} strategy and {recovery} recovery.")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The number theoretic transform of Kyber on stacks of polynomials in Z_3329[X]/(X^256 + 1), in NumPy.
+
+As in the Kyber specification, the transform is incomplete: it maps a polynomial to its residues modulo the
+128 polynomials X^2 - zeta^(2 br(i) + 1), with zeta = 17 and br the bit reversal of 7 bits, and products are
+computed pairwise on these residues. The polynomials are the last axis of the arrays, all other axes are
+processed at once, e.g. the secret keys of shape (keys, k, 256). Every layer of butterflies is one vectorized
+operation on a view of the array, with the twiddle factors read from precomputed tables.
+"""
+
+import numpy as np
+
+Q = 3329
+N = 256
+
+# zeta^br(i) for i = 0, ..., 127, in the order the butterflies use them
+ZETAS = np.array([pow(17, int(f"{i:07b}"[::-1], 2), Q) for i in range(128)], dtype=np.int64)
+# The constants of the 128 quadratic factors, zeta^(2 br(i) + 1)
+GAMMAS = np.array([(1 if i % 2 == 0 else -1)*ZETAS[64 + i//2] % Q for i in range(128)], dtype=np.int64)
+# 128^-1, to scale the inverse transform
+INVERSE_SCALE = pow(128, -1, Q)
+
+
+# The transform of the polynomials a along the last axis, with coefficients in 0, ..., Q - 1. With out, the
+# result is written to that array (which can be a itself) instead of a new one.
+def ntt(a, out=None):
+    out = _prepare(a, out)
+    t = np.empty(out.shape[:-1] + (N//2,), dtype=np.int64)
+    length, groups = N//2, 1
+    while length >= 2:
+        view = out.reshape(out.shape[:-1] + (groups, 2, length))
+        low, high = view[..., 0, :], view[..., 1, :]
+        product = t.reshape(low.shape)
+        np.multiply(high, ZETAS[groups:2*groups, None], out=product)
+        np.remainder(product, Q, out=product)
+        np.subtract(low, product, out=high)
+        np.add(low, product, out=low)
+        np.remainder(view, Q, out=view)
+        length, groups = length//2, groups*2
+    return out
+
+
+# The inverse of ntt
+def invNtt(a, out=None):
+    out = _prepare(a, out)
+    t = np.empty(out.shape[:-1] + (N//2,), dtype=np.int64)
+    length, groups = 2, N//4
+    while length <= N//2:
+        view = out.reshape(out.shape[:-1] + (groups, 2, length))
+        low, high = view[..., 0, :], view[..., 1, :]
+        difference = t.reshape(low.shape)
+        np.subtract(high, low, out=difference)
+        np.add(low, high, out=low)
+        np.multiply(difference, ZETAS[2*groups - 1:groups - 1:-1, None], out=high)
+        np.remainder(view, Q, out=view)
+        length, groups = length*2, groups//2
+    np.multiply(out, INVERSE_SCALE, out=out)
+    np.remainder(out, Q, out=out)
+    return out
+
+
+# The pairwise products of transformed polynomials, broadcasting over the other axes
+def baseMul(a, b):
+    a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+    a0, a1 = a[..., 0::2], a[..., 1::2]
+    b0, b1 = b[..., 0::2], b[..., 1::2]
+    result = np.empty(np.broadcast_shapes(a.shape, b.shape), dtype=np.int64)
+    result[..., 0::2] = (a0*b0 + (a1*b1 % Q)*GAMMAS) % Q
+    result[..., 1::2] = (a0*b1 + a1*b0) % Q
+    return result
+
+
+# The products of polynomials along the last axis, broadcasting over the other axes
+def polyMul(a, b):
+    return invNtt(baseMul(ntt(a), ntt(b)))
+
+
+def _prepare(a, out):
+    if out is None:
+        return np.ascontiguousarray(a, dtype=np.int64) % Q
+    if out.dtype != np.int64 or not out.flags.c_contiguous:
+        raise ValueError("The output of the transform has to be a contiguous int64 array.")
+    np.remainder(a, Q, out=out)
+    return out
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A local, batched Kyber as a stand-in for the attacked device, to validate the simulated coefficients per query.
+
+The arithmetic is that of Kyber.CPAPKE (round 3): secrets and errors from CBD, the module rank k, and the
+compression of ciphertexts to du and dv bits. The byte encodings and the XOF are left out, the matrix A
+is sampled uniformly by NumPy instead, so the keys have the same distribution but are not compatible with
+other implementations. All operations work on stacks of keys, e.g. the secret keys have shape (keys, k, 256),
+with the polynomial arithmetic of KyberNtt.py.
+
+The mismatch oracle answers whether the decryption of a manipulated ciphertext differs from an expected
+message, per message bit. With the FO transform, decapsulation re-encrypts the decrypted message, so a side
+channel on the re-encryption reveals the same bits; a plain decapsulation oracle only answers whether any bit
+differs, i.e. mismatch.any(axis=-1). A ciphertext with u = (0, ..., c, ..., 0), the constant c in block i,
+gives the message bits Compress(v_j - c*s_ij, 1), so every bit compares one coefficient of the block against
+a threshold chosen through v_j. attackBlocks runs the adaptive parallel attack from MismatchSimulator.py
+against the oracle with such queries.
+
+With u = (a_0, ..., a_(k-1)) in block i instead, bit j gives Compress(v_j - sum_t a_t s_i(j-t), 1), a query
+on a weighted sum of k consecutive coefficients. groupQueryPlan searches for a sequence of such queries that
+recovers every group of k <= MAX_GROUP_SIZE coefficients in groupQueries(eta1, k) queries, all groups of the
+block in parallel, and attackGroups runs it against the oracle. validateGroupSize checks the cost of groups of k
+positions that the non-adaptive baseline of the tradeoff optimizer assumes.
+"""
+
+import functools
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+from KyberNtt import Q, baseMul, invNtt, ntt
+from MismatchSimulator import BLOCK_SIZE, coeffPerQuery, groupQueries, sampleCBD
+from QueryTrees import loadQueryTree
+from StreamingStatistics import RecoveryStatistics
+
+
+@dataclass(frozen=True)
+class KyberParameters:
+    name: str
+    k: int
+    eta1: int
+    eta2: int
+    du: int
+    dv: int
+
+
+PARAMETERS = {parameters.name: parameters for parameters in (KyberParameters("Kyber512", 2, 3, 2, 10, 4),
+                                                             KyberParameters("Kyber768", 3, 2, 2, 10, 4),
+                                                             KyberParameters("Kyber1024", 4, 2, 2, 11, 5))}
+
+
+def compress(x, d):
+    return ((np.asarray(x, dtype=np.int64) % Q)*2**(d + 1) + Q)//(2*Q) % 2**d
+
+
+def decompress(x, d):
+    return (np.asarray(x, dtype=np.int64)*2*Q + 2**d)//2**(d + 1)
+
+
+# The product of the matrices or vectors of transformed polynomials a (..., m, k, 256) and b (..., k, 256),
+# transformed back
+def matVecMul(a, b):
+    return invNtt(baseMul(a, b[..., None, :, :]).sum(axis=-2) % Q)
+
+
+# The inner product of the vectors of transformed polynomials a and b (..., k, 256), transformed back
+def innerProduct(a, b):
+    return invNtt(baseMul(a, b).sum(axis=-2) % Q)
+
+
+def _cbd(rng, eta, shape):
+    return sampleCBD(rng, eta, shape).astype(np.int64) - eta
+
+
+# Generate keys key pairs. Returns the public keys, the transformed matrix A (keys, k, k, 256) and t
+# (keys, k, 256), and the secret keys s (keys, k, 256) with coefficients in -eta1, ..., eta1. As in Kyber,
+# A is sampled in the NTT domain.
+def keyGen(rng, parameters, keys):
+    k = parameters.k
+    A = rng.integers(0, Q, size=(keys, k, k, BLOCK_SIZE), dtype=np.int64)
+    s = _cbd(rng, parameters.eta1, (keys, k, BLOCK_SIZE))
+    e = _cbd(rng, parameters.eta1, (keys, k, BLOCK_SIZE))
+    return A, (matVecMul(A, ntt(s)) + e) % Q, s
+
+
+# Encrypt the messages (keys, 256) of bits. Returns the compressed ciphertexts u (keys, k, 256) and v (keys, 256).
+def encrypt(rng, parameters, A, t, messages):
+    keys, k = t.shape[:2]
+    r = ntt(_cbd(rng, parameters.eta1, (keys, k, BLOCK_SIZE)))
+    e1 = _cbd(rng, parameters.eta2, (keys, k, BLOCK_SIZE))
+    e2 = _cbd(rng, parameters.eta2, (keys, BLOCK_SIZE))
+    u = matVecMul(np.swapaxes(A, -3, -2), r) + e1
+    v = innerProduct(ntt(t), r) + e2 + decompress(messages, 1)
+    return compress(u, parameters.du), compress(v, parameters.dv)
+
+
+# Decrypt the compressed ciphertexts u and v with the transformed secret keys sHat, broadcasting over the
+# leading axes
+def decrypt(parameters, sHat, u, v):
+    w = decompress(v, parameters.dv) - innerProduct(sHat, ntt(decompress(u, parameters.du)))
+    return compress(w, 1)
+
+
+# Answers mismatch queries for a stack of secret keys and counts the queries asked to every key
+class MismatchOracle:
+    def __init__(self, parameters, secretKeys):
+        self.parameters = parameters
+        self.secretKeys = secretKeys
+        self.secretKeysNtt = ntt(secretKeys)
+        self.queries = np.zeros(len(secretKeys), dtype=np.int64)
+
+    # Whether every bit of the decryption of the ciphertexts u and v differs from messages, for the keys with
+    # the indices in keys (default: all keys)
+    def __call__(self, u, v, messages, keys=None):
+        if keys is None:
+            keys = np.arange(len(self.secretKeys))
+        self.queries[keys] += 1
+        return decrypt(self.parameters, self.secretKeysNtt[keys], u, v) != messages
+
+
+# The compressed constant c of u and, for every threshold t = -eta1, ..., eta1, the compressed v_j and the
+# expected message bit, such that the bit mismatches exactly if s_ij <= t. The smallest c that works for all
+# thresholds is used, so that a query can compare every coefficient against a threshold of its own.
+@functools.lru_cache(maxsize=None)
+def thresholdQueryTable(parameters):
+    values = np.arange(-parameters.eta1, parameters.eta1 + 1)
+    thresholds = np.arange(-parameters.eta1, parameters.eta1 + 1)
+    wanted = values[None, :] <= thresholds[:, None]
+    candidates = np.arange(2**parameters.dv)
+    for cu in range(1, 2**parameters.du):
+        # bits[cv, value] is the decrypted bit for s_ij = value
+        bits = compress(decompress(candidates, parameters.dv)[:, None]
+                        - decompress(cu, parameters.du)*values[None, :], 1).astype(bool)
+        cv, messageBits = [], []
+        for row in wanted:
+            for messageBit in (0, 1):
+                matches = np.flatnonzero(((bits != messageBit) == row).all(axis=1))
+                if len(matches) > 0:
+                    cv.append(matches[0])
+                    messageBits.append(messageBit)
+                    break
+            else:
+                break
+        else:
+            return cu, np.array(cv), np.array(messageBits)
+    raise ValueError(f"No threshold queries for {parameters.name}.")
+
+
+# The ciphertexts and expected messages that compare every coefficient of block of the secret keys against
+# the threshold in thresholds (keys, 256). A threshold of eta1 always mismatches.
+def thresholdCiphertexts(parameters, block, thresholds):
+    cu, cv, messageBits = thresholdQueryTable(parameters)
+    index = np.asarray(thresholds) + parameters.eta1
+    u = np.zeros((*index.shape[:-1], parameters.k, BLOCK_SIZE), dtype=np.int64)
+    u[..., block, 0] = cu
+    return u, cv[index], messageBits[index]
+
+
+# The threshold of every node of a threshold query tree, where going left means value <= threshold. Raises
+# ValueError if a node does not split the values left at it into the lowest and the highest ones.
+def nodeThresholds(tree):
+    thresholds = np.zeros(len(tree.leftMask), dtype=np.int64)
+    states = [(0, (1 << (2*tree.eta + 1)) - 1)]
+    while states:
+        node, state = states.pop()
+        left = int(tree.leftMask[node])
+        threshold = left.bit_length() - 1
+        if left & ~state or state & ((1 << (threshold + 1)) - 1) != left:
+            raise ValueError(f"The {tree.kind} query tree does not only ask threshold queries.")
+        thresholds[node] = threshold - tree.eta
+        for child, childState in ((tree.left[node], left), (tree.right[node], state & ~left)):
+            if child >= 0:
+                states.append((child, childState))
+    return thresholds
+
+
+# Run the adaptive parallel attack with p positions per query against block of all keys of the oracle, with the
+# query tree (default: the alphabetic tree). Returns the recovered coefficients (keys, 256) and, as
+# MismatchSimulator.simulateBlocks, the number of queries until the block is recovered, the number of queries
+# until the first position runs out of coefficients and the number of coefficients recovered by then.
+def attackBlocks(oracle, block, p, tree=None):
+    eta = oracle.parameters.eta1
+    if tree is None:
+        tree = loadQueryTree(eta)
+    thresholds = nodeThresholds(tree)
+    keys = len(oracle.secretKeys)
+    rows = np.broadcast_to(np.arange(keys)[:, None], (keys, p))
+    coefficient = np.full((keys, p), -1, dtype=np.int64) # The coefficient in each position, -1 if none
+    node = np.zeros((keys, p), dtype=np.int64)
+    nextCoefficient = np.zeros(keys, dtype=np.int64)
+    recovered = np.zeros(keys, dtype=np.int64)
+    coefficients = np.zeros((keys, BLOCK_SIZE), dtype=np.int64)
+    fullQueries = np.zeros(keys, dtype=np.int64)
+    partialQueries = np.zeros(keys, dtype=np.int64)
+    partialRecovered = np.zeros(keys, dtype=np.int64)
+    busy = np.ones(keys, dtype=bool)
+
+    queries = 0
+    while True:
+        free = coefficient < 0
+        index = nextCoefficient[:, None] + np.cumsum(free, axis=1) - 1
+        assigned = free & (index < BLOCK_SIZE)
+        coefficient[assigned] = index[assigned]
+        node[assigned] = 0
+        nextCoefficient += assigned.sum(axis=1)
+
+        idle = busy & (free & ~assigned).any(axis=1)
+        partialQueries[idle] = queries
+        partialRecovered[idle] = recovered[idle]
+        busy &= ~idle
+
+        active = coefficient >= 0
+        asking = np.flatnonzero(active.any(axis=1))
+        if len(asking) == 0:
+            break
+        queries += 1
+        queryThresholds = np.full((keys, BLOCK_SIZE), eta, dtype=np.int64)
+        queryThresholds[rows[active], coefficient[active]] = thresholds[node[active]]
+        u, v, messages = thresholdCiphertexts(oracle.parameters, block, queryThresholds[asking])
+        mismatch = np.zeros((keys, BLOCK_SIZE), dtype=bool)
+        mismatch[asking] = oracle(u, v, messages, asking)
+
+        goesLeft = mismatch[rows, np.maximum(coefficient, 0)]
+        child = np.where(goesLeft, tree.left[node], tree.right[node])
+        leaf = active & (child < 0)
+        coefficients[rows[leaf], coefficient[leaf]] = -1 - child[leaf] - eta
+        node = np.where(active & ~leaf, child, node)
+        coefficient[leaf] = -1
+        recovered += leaf.sum(axis=1)
+        fullQueries[leaf.any(axis=1)] = queries
+    return coefficients, fullQueries, partialQueries, partialRecovered
+
+
+# Attack block 0 of keys fresh keys of scheme for every p in pValues, see attackBlocks. Returns a
+# RecoveryStatistics for every p. Raises RuntimeError if a coefficient is recovered incorrectly.
+def attackStatistics(scheme, pValues, keys=1000, seed=0, tree=None):
+    parameters = PARAMETERS[scheme]
+    rng = np.random.default_rng(seed)
+    statistics = []
+    for p in pValues:
+        secretKeys = keyGen(rng, parameters, keys)[2]
+        oracle = MismatchOracle(parameters, secretKeys)
+        coefficients, *samples = attackBlocks(oracle, 0, p, tree)
+        if not np.array_equal(coefficients, secretKeys[:, 0]):
+            raise RuntimeError(f"The attack on {scheme} with p = {p} recovered wrong coefficients.")
+        statistics.append(RecoveryStatistics())
+        statistics[-1].add(*samples)
+    return statistics
+
+
+# Coefficients recovered per query for partial and full recovery against the local oracle, to compare with
+# the simulated tables of the coefficient table store
+def attackCoeffPerQuery(scheme, pValues, keys=1000, seed=0, tree=None):
+    return coeffPerQuery(attackStatistics(scheme, pValues, keys, seed, tree))
+
+
+# The queries that recover groups of k consecutive coefficients non-adaptively: one u per round, shared by all
+# groups of the block, and a decision tree over the values of a group, where every node picks the v of the
+# last coefficient of the group. Leaves stay where they are, so every group takes all rounds.
+@dataclass(frozen=True)
+class GroupQueryPlan:
+    k: int
+    u: np.ndarray # (rounds, k) compressed coefficients a_0, ..., a_(k-1) of u in the attacked block
+    v: np.ndarray # (nodes,) compressed v of the last coefficient of the group at every node
+    child: np.ndarray # (nodes, 2) the next node if the decrypted bit is 0 or 1
+    values: np.ndarray # (nodes, k) the values of the group at every leaf
+
+
+# bits[v, value] is the decrypted bit of the last coefficient of a group with the given values, for every
+# compressed v, if the coefficients of u are the compressed a
+def _groupBits(parameters, a, values):
+    weights = decompress(a, parameters.du)[::-1]
+    candidates = decompress(np.arange(2**parameters.dv), parameters.dv)
+    return compress(candidates[:, None] - values @ weights, 1).astype(bool)
+
+
+# The largest group size that groupQueryPlan searches for. The search is not bounded in terms of k, and the
+# number of values of a group grows as (2 eta + 1)**k.
+MAX_GROUP_SIZE = 4
+
+
+# Search for a GroupQueryPlan for groups of k coefficients with groupQueries(eta1, k) queries. Every round
+# tries the u from a fixed random sample of candidates, and splits the values left at every node as evenly
+# as possible. The depth-first search gives up after trying budget candidates in total. Raises ValueError if
+# no plan is found or k > MAX_GROUP_SIZE.
+@functools.lru_cache(maxsize=None)
+def groupQueryPlan(parameters, k, candidates=500, seed=0, budget=100000):
+    if k > MAX_GROUP_SIZE:
+        raise ValueError(f"Groups of more than {MAX_GROUP_SIZE} coefficients are not supported.")
+    eta = parameters.eta1
+    values = np.array(list(itertools.product(range(-eta, eta + 1), repeat=k)), dtype=np.int64)
+    rounds = groupQueries(eta, k)
+    us = np.random.default_rng(seed).integers(0, 2**parameters.du, size=(candidates, k))
+    tables = {} # The bits of the candidates tried so far, see _groupBits
+    tried = 0
+
+    def table(i):
+        if i not in tables:
+            tables[i] = _groupBits(parameters, us[i], values)
+        return tables[i]
+
+    # The choice of u and of the v of every node for rounds r, r + 1, ..., or None
+    def search(nodes, r):
+        nonlocal tried
+        nodes = [node for node in nodes if len(node) > 1]
+        if not nodes:
+            return []
+        if r == rounds:
+            return None
+        limit = 2**(rounds - r - 1)
+        for i in range(candidates):
+            if tried == budget:
+                return None
+            tried += 1
+            bits = table(i)
+            splits = {}
+            for node in nodes:
+                ones = bits[:, node].sum(axis=1)
+                fits = np.flatnonzero((ones <= limit) & (len(node) - ones <= limit))
+                if len(fits) == 0:
+                    break
+                splits[tuple(node)] = fits[np.argmin(np.abs(2*ones[fits] - len(node)))]
+            else:
+                children = [child for node in nodes
+                            for child in (node[~bits[splits[tuple(node)], node]], node[bits[splits[tuple(node)], node]])]
+                rest = search(children, r + 1)
+                if rest is not None:
+                    return [(i, splits)] + rest
+        return None
+
+    choices = search([np.arange(len(values))], 0)
+    if choices is None:
+        raise ValueError(f"No queries found that recover groups of {k} coefficients of {parameters.name} "
+                         f"in {rounds} queries within {budget} candidates.")
+
+    v, child, leafValues = [], [], []
+
+    def addNode(node, r):
+        index = len(v)
+        v.append(0)
+        child.append([index, index])
+        leafValues.append(values[node[0]] if len(node) > 0 else np.zeros(k, dtype=np.int64)) # Empty: never reached
+        if len(node) > 1:
+            i, splits = choices[r]
+            v[index] = splits[tuple(node)]
+            bits = table(i)[v[index], node]
+            child[index] = [addNode(node[~bits], r + 1), addNode(node[bits], r + 1)]
+        return index
+
+    addNode(np.arange(len(values)), 0)
+    return GroupQueryPlan(k, us[[i for i, _ in choices]], np.array(v), np.array(child), np.array(leafValues))
+
+
+# Recover all 256//k groups of k consecutive coefficients of block of all keys of the oracle in parallel, with
+# groupQueryPlan. If k does not divide 256, the last 256 % k coefficients are not recovered and left 0.
+def attackGroups(oracle, block, k):
+    parameters = oracle.parameters
+    plan = groupQueryPlan(parameters, k)
+    keys = len(oracle.secretKeys)
+    groups = BLOCK_SIZE//k
+    last = np.arange(groups)*k + k - 1
+    node = np.zeros((keys, groups), dtype=np.int64)
+    messages = np.zeros((keys, BLOCK_SIZE), dtype=np.int64) # A mismatch against 0 is the decrypted bit
+    for a in plan.u:
+        u = np.zeros((keys, parameters.k, BLOCK_SIZE), dtype=np.int64)
+        u[:, block, :k] = a
+        v = np.zeros((keys, BLOCK_SIZE), dtype=np.int64)
+        v[:, last] = plan.v[node]
+        bits = oracle(u, v, messages)[:, last]
+        node = plan.child[node, bits.astype(np.int64)]
+    coefficients = np.zeros((keys, BLOCK_SIZE), dtype=np.int64)
+    coefficients[:, :groups*k] = plan.values[node].reshape(keys, groups*k)
+    return coefficients
+
+
+# Whether groups of k positions of scheme are recovered in groupQueries(eta1, k) queries, checked against
+# keys fresh keys through the oracle
+@functools.lru_cache(maxsize=None)
+def validateGroupSize(scheme, k, keys=100, seed=0):
+    parameters = PARAMETERS[scheme]
+    try:
+        groupQueryPlan(parameters, k)
+    except ValueError:
+        return False
+    secretKeys = keyGen(np.random.default_rng(seed), parameters, keys)[2]
+    oracle = MismatchOracle(parameters, secretKeys)
+    coefficients = attackGroups(oracle, 0, k)
+    used = BLOCK_SIZE//k*k
+    return (np.array_equal(coefficients[:, :used], secretKeys[:, 0, :used])
+            and (oracle.queries == groupQueries(parameters.eta1, k)).all())
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The versions of Kyber that the tradeoff optimizers know about. The results of the simulations of the
+adaptive approach are read from the coefficient table store, see CoefficientTables.py.
+"""
+
+from TradeoffOptimizer import KyberScheme
+
+# Kyber768 uses the security level table of Kyber1024, for n <= 768.
+kyber512 = KyberScheme("Kyber512", 2, 3, "Kyber512")
+kyber768 = KyberScheme("Kyber768", 3, 2, "Kyber1024")
+kyber1024 = KyberScheme("Kyber1024", 4, 2, "Kyber1024")
+
+schemes = {scheme.name: scheme for scheme in (kyber512, kyber768, kyber1024)}
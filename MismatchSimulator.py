@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized Monte Carlo simulation of the adaptive parallel mismatch attack on one 256 block of the secret key.
+
+Each query compares up to p coefficients of the block against thresholds, one comparison per coefficient.
+A coefficient is recovered by walking down a decision tree of such comparisons, so it needs as many queries
+as its depth in the tree, by default the optimal threshold tree from QueryTrees.py. The p positions of a
+query work through the block in order: as soon as the coefficient in a position is recovered, the position
+moves on to the next coefficient that has not been started. All trials are simulated at once, with one query
+per step for every trial.
+
+For every p this gives the expected number of coefficients recovered per query
+- for full recovery: 256 divided by the expected number of queries until the whole block is recovered
+- for partial recovery: the number of coefficients recovered while all p positions are still busy, divided
+  by the number of queries until the first position runs out of coefficients, both in expectation
+as in the tables of the coefficient table store.
+"""
+
+import math
+
+import numpy as np
+
+from CoefficientTables import saveCoeffPerQuery
+from QueryTrees import loadQueryTree
+from StreamingStatistics import RecoveryStatistics
+
+BLOCK_SIZE = 256
+
+
+# The probabilities of the values -eta, ..., eta of the centered binomial distribution CBD(eta)
+def cbdProbabilities(eta):
+    return np.array([math.comb(2*eta, k) for k in range(2*eta + 1)])/4**eta
+
+
+# Sample coefficients from CBD(eta), as the index value + eta of the value
+def sampleCBD(rng, eta, shape):
+    bits = rng.integers(0, 2, size=(*shape, 2*eta), dtype=np.int8)
+    return bits[..., :eta].sum(axis=-1) - bits[..., eta:].sum(axis=-1) + eta
+
+
+# Simulate the attack with p positions per query on the blocks in queryDepths, an array of shape
+# (trials, 256) with the number of queries each coefficient needs. Returns, per trial, the number of queries
+# until the block is recovered, the number of queries until the first position runs out of coefficients and
+# the number of coefficients recovered by then.
+def simulateBlocks(queryDepths, p):
+    trials, blockSize = queryDepths.shape
+    rows = np.arange(trials)[:, None]
+    remaining = np.zeros((trials, p), dtype=np.int64) # Queries left for the coefficient in each position
+    nextCoefficient = np.zeros(trials, dtype=np.int64)
+    recovered = np.zeros(trials, dtype=np.int64)
+    fullQueries = np.zeros(trials, dtype=np.int64)
+    partialQueries = np.zeros(trials, dtype=np.int64)
+    partialRecovered = np.zeros(trials, dtype=np.int64)
+    busy = np.ones(trials, dtype=bool) # All positions have had a coefficient so far
+
+    queries = 0
+    while True:
+        free = remaining == 0
+        # Positions that become free take the next coefficients of the block, in order
+        index = nextCoefficient[:, None] + np.cumsum(free, axis=1) - 1
+        assigned = free & (index < blockSize)
+        remaining[assigned] = queryDepths[np.broadcast_to(rows, index.shape)[assigned], index[assigned]]
+        nextCoefficient += assigned.sum(axis=1)
+
+        idle = busy & (free & ~assigned).any(axis=1)
+        partialQueries[idle] = queries
+        partialRecovered[idle] = recovered[idle]
+        busy &= ~idle
+
+        active = remaining > 0
+        if not active.any():
+            break
+        queries += 1
+        remaining[active] -= 1
+        done = active & (remaining == 0)
+        recovered += done.sum(axis=1)
+        fullQueries[done.any(axis=1)] = queries
+    return fullQueries, partialQueries, partialRecovered
+
+
+# Simulate the attack with p positions per query on trials blocks from CBD(eta), see simulateBlocks
+def simulateTrials(rng, eta, p, trials, queryDepths=None):
+    if queryDepths is None:
+        queryDepths = loadQueryTree(eta).depths
+    queryDepths = np.asarray(queryDepths, dtype=np.int64)
+    return simulateBlocks(queryDepths[sampleCBD(rng, eta, (trials, BLOCK_SIZE))], p)
+
+
+# Simulate the attack for every p in pValues on blocks with coefficients from CBD(eta), using the depths of the
+# alphabetic query tree by default. The trials are simulated in batches of at most batchSize and only their
+# streaming statistics are kept, so the memory does not grow with the number of trials.
+# Returns a RecoveryStatistics for every p.
+def simulateStatistics(eta, pValues, trials=10000, seed=0, queryDepths=None, batchSize=10000):
+    rng = np.random.default_rng(seed)
+    return [accumulateStatistics(rng, eta, p, trials, queryDepths, batchSize) for p in pValues]
+
+
+# The RecoveryStatistics of trials trials with p positions per query, simulated in batches of at most batchSize
+def accumulateStatistics(rng, eta, p, trials, queryDepths=None, batchSize=10000):
+    statistics = RecoveryStatistics()
+    for start in range(0, trials, batchSize):
+        statistics.add(*simulateTrials(rng, eta, p, min(batchSize, trials - start), queryDepths))
+    return statistics
+
+
+# The expected coefficients recovered per query for partial and full recovery, from a RecoveryStatistics
+# for every p
+def coeffPerQuery(statistics):
+    partial = np.array([s.partialRecovered.mean/s.partialQueries.mean for s in statistics])
+    full = np.array([BLOCK_SIZE/s.fullQueries.mean for s in statistics])
+    return partial, full
+
+
+# Expected coefficients recovered per query for partial and full recovery of a block with coefficients from
+# CBD(eta), for every p in pValues, see simulateStatistics
+def simulateCoeffPerQuery(eta, pValues, trials=10000, seed=0, queryDepths=None, batchSize=10000):
+    return coeffPerQuery(simulateStatistics(eta, pValues, trials, seed, queryDepths, batchSize))
+
+
+# The number of queries that recover a group of size coefficients from CBD(eta) non-adaptively, the smallest
+# number of bits that tells all (2 eta + 1)**size values of the group apart. That mismatch queries reach this
+# bound is checked against a local Kyber by KyberOracle.validateGroupSize.
+def groupQueries(eta, size):
+    return ((2*eta + 1)**size - 1).bit_length()
+
+
+# The coefficients per query for partial and full recovery of the non-adaptive approach where groups of k
+# positions are recovered together, for every p <= 256//k in pValues groups in parallel. The groups are
+# queued through simulateBlocks. If k does not divide 256, the block starts with a smaller group, which is
+# then the first one recovered. Every group needs the same number of queries whatever its values, so the
+# queue of a single block is exact, it does not validate the number of queries per group.
+def simulateGroupCoeffPerQuery(eta, k, pValues):
+    smaller = BLOCK_SIZE % k
+    sizes = ([smaller] if smaller else []) + [k]*(BLOCK_SIZE//k)
+    depths = np.array([[groupQueries(eta, size) for size in sizes]], dtype=np.int64)
+    partial, full = [], []
+    for p in pValues:
+        if p > BLOCK_SIZE//k:
+            break
+        fullQueries, partialQueries, partialRecovered = simulateBlocks(depths, p)
+        partial.append((k*partialRecovered[0] - (k - smaller if smaller else 0))/partialQueries[0])
+        full.append(BLOCK_SIZE/fullQueries[0])
+    return np.array(partial), np.array(full)
+
+
+# Simulate p = 1, ..., highestP and store the partial and full tables for scheme in the coefficient table store.
+# A new strategy name is used by default, so that the tables from the paper are kept.
+def buildCoeffPerQueryTables(scheme, eta, highestP, trials=10000, seed=0, strategy="simulated"):
+    partial, full = simulateCoeffPerQuery(eta, range(1, highestP + 1), trials, seed)
+    metadata = {"eta": eta, "trials": trials, "seed": seed}
+    return [saveCoeffPerQuery(partial, scheme, strategy, "partial", metadata=metadata),
+            saveCoeffPerQuery(full, scheme, strategy, "full", metadata=metadata)]
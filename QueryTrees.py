@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precomputed query strategies for a single coefficient from the centered binomial distribution CBD(eta).
+
+A strategy is a binary decision tree over the values -eta, ..., eta, where every query splits the remaining
+values in two. The kinds of trees are
+- "alphabetic": the queries are threshold comparisons, as in the mismatch attack, with the lowest expected
+  depth. Its expected depth is the theoretical limit of the adaptive approach (2.5625 for eta = 3, 2.3125
+  for eta = 2).
+- "huffman": the queries can be arbitrary subsets of the values (a Huffman code). This is a lower bound
+  for any strategy with binary answers.
+- "constrained": alphabetic trees of depth at most maxDepth with the lowest expected depth. With p positions
+  queried in parallel, full recovery waits for the deepest coefficient, so limiting the depth can pay off.
+- "worstFirst" and others: lexicographically optimized trees, see StrategyOptimizer.py.
+
+The trees are stored as lookup tables in a small store, one .npz file per tree listed in an index file.
+Node k asks whether the value is in the set leftMask[k], a bitmask over the value indices value + eta, and
+continues with left[k] or right[k]. Negative children -1 - i are leaves for value index i. depths[i] is
+the number of queries needed for value index i.
+"""
+
+import functools
+import heapq
+import json
+import math
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+TREE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "queryTrees")
+
+KINDS = ("alphabetic", "huffman", "constrained", "worstFirst")
+
+
+@dataclass(frozen=True)
+class QueryTree:
+    eta: int
+    kind: str
+    maxDepth: int # The depth of the tree, or the depth limit for constrained trees
+    leftMask: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    depths: np.ndarray
+
+    @property
+    def probabilities(self):
+        return np.array([math.comb(2*self.eta, k) for k in range(2*self.eta + 1)])/4**self.eta
+
+    @property
+    def expectedDepth(self):
+        return float(self.probabilities @ self.depths)
+
+    # The answers to the queries for the value index, as the sequence of visited nodes and whether the value
+    # went left
+    def path(self, valueIndex):
+        node, path = 0, []
+        while node >= 0:
+            goesLeft = bool((int(self.leftMask[node]) >> valueIndex) & 1)
+            path.append((node, goesLeft))
+            node = int(self.left[node] if goesLeft else self.right[node])
+        return path
+
+
+def _weights(eta):
+    return [math.comb(2*eta, k) for k in range(2*eta + 1)]
+
+
+# Turn a nested tree of (left, right) tuples with value indices at the leaves into a QueryTree. maxDepth is the
+# depth limit of constrained trees, otherwise the depth of the tree is used.
+def nestedToQueryTree(eta, kind, root, maxDepth=None):
+    leftMask, left, right = [], [], []
+    depths = [0]*(2*eta + 1)
+
+    def values(subtree):
+        return [subtree] if isinstance(subtree, int) else values(subtree[0]) + values(subtree[1])
+
+    def visit(subtree, depth):
+        if isinstance(subtree, int):
+            depths[subtree] = depth
+            return -1 - subtree
+        node = len(left)
+        leftMask.append(sum(1 << i for i in values(subtree[0])))
+        left.append(0)
+        right.append(0)
+        left[node] = visit(subtree[0], depth + 1)
+        right[node] = visit(subtree[1], depth + 1)
+        return node
+
+    visit(root, 0)
+    return QueryTree(eta, kind, max(depths) if maxDepth is None else maxDepth, np.array(leftMask, np.int64),
+                     np.array(left, np.int64), np.array(right, np.int64), np.array(depths, np.int64))
+
+
+# The threshold tree with the lowest expected depth among trees of depth at most maxDepth (None: no limit).
+# Among optimal trees, the lowest threshold is preferred.
+def alphabeticTree(eta, maxDepth=None):
+    weights = _weights(eta)
+    limit = len(weights) - 1 if maxDepth is None else maxDepth
+    if 2**limit < len(weights):
+        raise ValueError(f"CBD({eta}) has {len(weights)} values, which do not fit in a tree of depth {limit}.")
+
+    @functools.lru_cache(maxsize=None)
+    def subtree(i, j, depth): # The cost and threshold of the best tree for the values i, ..., j
+        if i == j:
+            return 0, None
+        if 2**depth < j - i + 1:
+            return math.inf, None
+        cost, threshold = min((subtree(i, k, depth - 1)[0] + subtree(k + 1, j, depth - 1)[0], k)
+                              for k in range(i, j))
+        return cost + sum(weights[i:j + 1]), threshold
+
+    def build(i, j, depth):
+        if i == j:
+            return i
+        k = subtree(i, j, depth)[1]
+        return (build(i, k, depth - 1), build(k + 1, j, depth - 1))
+
+    root = build(0, len(weights) - 1, limit)
+    if maxDepth is None:
+        return nestedToQueryTree(eta, "alphabetic", root)
+    return nestedToQueryTree(eta, "constrained", root, maxDepth)
+
+
+# The Huffman tree, where queries can ask for any subset of the values. Ties are broken by the lowest values.
+def huffmanTree(eta):
+    heap = [(w, i, i) for i, w in enumerate(_weights(eta))]
+    heapq.heapify(heap)
+    order = len(heap)
+    while len(heap) > 1:
+        w1, _, a = heapq.heappop(heap)
+        w2, _, b = heapq.heappop(heap)
+        heapq.heappush(heap, (w1 + w2, order, (a, b)))
+        order += 1
+    return nestedToQueryTree(eta, "huffman", heap[0][2])
+
+
+def treeFileName(eta, kind, maxDepth):
+    return f"eta{eta}-{kind}.npz" if kind != "constrained" else f"eta{eta}-{kind}-{maxDepth}.npz"
+
+
+def readIndex(directory=TREE_DIR):
+    path = os.path.join(directory, "index.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def saveQueryTree(tree, directory=TREE_DIR):
+    entry = {"eta": tree.eta, "kind": tree.kind, "maxDepth": tree.maxDepth, "expectedDepth": tree.expectedDepth,
+             "file": treeFileName(tree.eta, tree.kind, tree.maxDepth)}
+    os.makedirs(directory, exist_ok=True)
+    np.savez(os.path.join(directory, entry["file"]), leftMask=tree.leftMask, left=tree.left, right=tree.right,
+             depths=tree.depths)
+
+    index = [e for e in readIndex(directory) if e["file"] != entry["file"]]
+    index.append(entry)
+    path = os.path.join(directory, "index.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(path + ".tmp", path)
+    loadQueryTree.cache_clear()
+    return entry
+
+
+# Compute and store the alphabetic and Huffman trees and the constrained trees for every depth limit from the
+# smallest possible one up to the depth of the alphabetic tree, for every eta in etas
+def buildQueryTrees(etas=(2, 3), directory=TREE_DIR):
+    entries = []
+    for eta in etas:
+        alphabetic = alphabeticTree(eta)
+        trees = [alphabetic, huffmanTree(eta)]
+        trees += [alphabeticTree(eta, maxDepth)
+                  for maxDepth in range(math.ceil(math.log2(2*eta + 1)), alphabetic.maxDepth + 1)]
+        entries += [saveQueryTree(tree, directory) for tree in trees]
+    return entries
+
+
+# A tree from the store, read once. For constrained trees, maxDepth is the depth limit.
+@functools.lru_cache(maxsize=None)
+def loadQueryTree(eta, kind="alphabetic", maxDepth=None, directory=TREE_DIR):
+    for entry in readIndex(directory):
+        if (entry["eta"], entry["kind"]) == (eta, kind) and (kind != "constrained" or entry["maxDepth"] == maxDepth):
+            with np.load(os.path.join(directory, entry["file"])) as data:
+                arrays = {name: data[name] for name in ("leftMask", "left", "right", "depths")}
+            for array in arrays.values():
+                array.flags.writeable = False
+            return QueryTree(eta, kind, entry["maxDepth"], **arrays)
+    raise KeyError(f"No {kind} query tree for CBD({eta})" + (f" of depth {maxDepth}." if maxDepth else "."))
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cost of the post-processing, i.e. of solving the remaining LWE problem with the Lattice Estimator,
+as a function of the number of unknown coefficients n of the secret key.
+
+Computed costs are kept in a table store: one binary array of log2 costs per (scheme, reduction cost
+model, reduction shape model, estimator version, n range), listed in an index file. Tables can also be
+built adaptively, calling the estimator on a coarse grid of n that is only refined where linear
+interpolation between the grid points is not accurate enough, or with several post-processing algorithms
+at once, keeping the cheapest one for every n.
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+ESTIMATOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "estimator")
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "securityLevels")
+
+
+# A short hash of the estimator source code, identifying the version that produced a table
+def estimatorHash(estimatorDir=ESTIMATOR_DIR):
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(estimatorDir)):
+        if name.endswith(".py"):
+            h.update(name.encode() + b"\0")
+            with open(os.path.join(estimatorDir, name), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def schemeName(parameters):
+    return str(parameters.tag).replace(" ", "")
+
+
+# Name of a reduction cost or shape model, e.g. "MATZOV" or "gsa"
+def modelName(model):
+    if model is None:
+        from estimator.conf import red_cost_model
+        model = red_cost_model
+    if isinstance(model, str):
+        return model
+    return model.__name__
+
+
+# The shared, warm pool of estimator processes, see estimator.util.worker_pool
+def workerPool(jobs=None):
+    from estimator.util import worker_pool
+    return worker_pool(jobs)
+
+
+def _quietEstimator():
+    from estimator import Logging
+    Logging.set_level(Logging.LEVEL0)
+
+
+# Estimate the cost of post-processing for a run of n values. With warmStart, the searches for the optimal
+# β of the attack and of its uSVP baseline for n are seeded with the optimum for the previous n of the run.
+def estimateSecurityLevels(parameters, nValues, warmStart=False, redCostModel=None, redShapeModel="gsa"):
+    from estimator import LWE
+    from estimator.conf import red_cost_model
+
+    if redCostModel is None:
+        redCostModel = red_cost_model
+
+    securityLevels = []
+    cost = None
+    for n in nValues:
+        cost = LWE.primal_bdd(parameters.updated(n=n), red_shape_model=redShapeModel, red_cost_model=redCostModel,
+                              warm_start=cost if warmStart else None)
+        securityLevels.append((n, float(cost['rop'].log2())))
+    return securityLevels
+
+
+def _estimateSecurityLevels(args):
+    _quietEstimator()
+    return estimateSecurityLevels(*args)
+
+
+# The first line of a checkpoint file. Warm-started sweeps get their own checkpoints, the results are not
+# guaranteed to be the same as those of the full search.
+def checkpointHeader(parameters, redCostModel, redShapeModel, warmStart=False):
+    header = f"# {parameters.tag} {modelName(redCostModel)} {modelName(redShapeModel)}"
+    return header + " warm-start" if warmStart else header
+
+
+# Read the n values that are already finished from a checkpoint file. With keyFields > 1, every line
+# holds n and further key fields (e.g. the algorithm) before the value, and the keys are tuples.
+def readCheckpoint(checkpointFile, header, keyFields=1):
+    finished = {}
+    if checkpointFile is None or not os.path.exists(checkpointFile):
+        return finished
+
+    with open(checkpointFile) as f:
+        line = f.readline().rstrip("\n")
+        if line and line != header:
+            raise ValueError(f"Checkpoint {checkpointFile} belongs to '{line[2:]}', not '{header[2:]}'.")
+        for line in f:
+            fields = line.split()
+            if len(fields) != keyFields + 1 or not line.endswith("\n"):
+                continue # An interrupted write, the value is recomputed
+            key = int(fields[0]) if keyFields == 1 else (int(fields[0]), *fields[1:keyFields])
+            finished[key] = float(fields[-1])
+    return finished
+
+
+# Open a checkpoint file for appending, writing the header to a new file
+def openCheckpoint(checkpointFile, header):
+    checkpoint = open(checkpointFile, "a+")
+    checkpoint.seek(0)
+    content = checkpoint.read()
+    if not content:
+        checkpoint.write(header + "\n")
+    elif not content.endswith("\n"):
+        checkpoint.truncate(content.rfind("\n") + 1) # Drop a line left behind by an interrupted write
+    return checkpoint
+
+
+# Split the n values into runs of at most chunkSize consecutive values
+def splitIntoRuns(nValues, chunkSize):
+    runs = []
+    for n in sorted(nValues):
+        if runs and runs[-1][-1] == n - 1 and len(runs[-1]) < chunkSize:
+            runs[-1].append(n)
+        else:
+            runs.append([n])
+    return runs
+
+
+# Estimate the cost of post-processing for all n in nValues using a pool of processes.
+# Each finished n is appended to checkpointFile, so an interrupted run can be resumed.
+# With warmStart, every process sweeps runs of chunkSize consecutive n values and seeds the search
+# for each n with the optimum of the previous one.
+def sweepSecurityLevels(parameters, nValues, checkpointFile=None, jobs=None, warmStart=False, chunkSize=16,
+                        redCostModel=None, redShapeModel="gsa"):
+    if jobs is None:
+        jobs = os.cpu_count()
+    if not warmStart:
+        chunkSize = 1
+
+    header = checkpointHeader(parameters, redCostModel, redShapeModel, warmStart)
+    finished = readCheckpoint(checkpointFile, header)
+    # Larger n are more expensive, so start with them to balance the load at the end of the sweep
+    remaining = splitIntoRuns(set(nValues) - set(finished), chunkSize)[::-1]
+
+    checkpoint = None
+    if checkpointFile is not None:
+        checkpoint = openCheckpoint(checkpointFile, header)
+
+    try:
+        tasks = [(parameters, run, warmStart, redCostModel, redShapeModel) for run in remaining]
+        for securityLevels in workerPool(jobs).imap_unordered(_estimateSecurityLevels, tasks):
+            for n, securityLevel in securityLevels:
+                finished[n] = securityLevel
+                if checkpoint is not None:
+                    checkpoint.write(f"{n} {securityLevel!r}\n")
+            if checkpoint is not None:
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    return [finished[n] for n in nValues]
+
+
+def readIndex(directory=TABLE_DIR):
+    path = os.path.join(directory, "index.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+# The file name of a table, interpolated tables (resolution "approx") get a suffix of their own
+def tableFileName(entry, suffix=""):
+    if entry.get("resolution", "exact") != "exact":
+        suffix = "-" + entry["resolution"] + suffix
+    return "{scheme}-{algorithm}-{redCostModel}-{redShapeModel}-{estimatorHash}-{lowestN}-{highestN}".format(**entry) \
+        + suffix + ".npy"
+
+
+# Store the log2 costs for n = lowestN, lowestN + 1, ... in the table store.
+# Additional information about how the table was computed can be added to its index entry with metadata.
+# resolution is "exact" if every n was estimated, or "approx" if the table is interpolated.
+def saveSecurityLevels(securityLevels, lowestN, scheme, redCostModel=None, redShapeModel="gsa", algorithm="bdd",
+                       version=None, directory=TABLE_DIR, metadata=None, resolution="exact"):
+    if version is None:
+        version = estimatorHash()
+    highestN = lowestN + len(securityLevels) - 1
+    entry = {"scheme": scheme, "algorithm": algorithm, "redCostModel": modelName(redCostModel),
+             "redShapeModel": modelName(redShapeModel), "estimatorHash": version, "lowestN": lowestN,
+             "highestN": highestN, "resolution": resolution}
+    if metadata is not None:
+        entry.update(metadata)
+    entry["file"] = tableFileName(entry)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, entry["file"]), np.asarray(securityLevels, dtype=np.float64))
+
+    index = [e for e in readIndex(directory) if e["file"] != entry["file"]]
+    index.append(entry)
+    path = os.path.join(directory, "index.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(path + ".tmp", path)
+    return entry
+
+
+# Find the index entry of a table in the store, see loadSecurityLevels
+def findSecurityLevels(scheme, redCostModel="MATZOV", redShapeModel="gsa", algorithm="bdd", version=None,
+                       nRange=None, directory=TABLE_DIR, resolution="exact"):
+    candidates = [e for e in readIndex(directory)
+                  if e["scheme"] == scheme and e["algorithm"] == algorithm
+                  and e.get("resolution", "exact") == resolution
+                  and e["redCostModel"] == modelName(redCostModel) and e["redShapeModel"] == modelName(redShapeModel)
+                  and (version is None or e["estimatorHash"] == version)
+                  and (nRange is None or e["lowestN"] <= nRange[0] and nRange[1] <= e["highestN"])]
+    if not candidates:
+        raise KeyError(f"No {resolution} {algorithm} security level table for {scheme} with "
+                       f"{modelName(redCostModel)}/{modelName(redShapeModel)}.")
+
+    current = [e for e in candidates if e["estimatorHash"] == estimatorHash()]
+    return (current or candidates)[-1]
+
+
+# Find a table in the store and memory-map it. Returns lowestN and the log2 costs for n = lowestN, ...
+# algorithm is the post-processing algorithm, or "best" for the cheapest of several algorithms per n.
+# If version is None, a table computed with the current estimator is preferred, otherwise the most
+# recently stored one is used. If nRange = (lowestN, highestN) is given, the table has to cover it.
+# The default reduction cost model is the default of the estimator, i.e. MATZOV. Interpolated tables, see
+# buildAdaptiveSecurityLevelTable, are only loaded with resolution="approx".
+def loadSecurityLevels(scheme, redCostModel="MATZOV", redShapeModel="gsa", algorithm="bdd", version=None,
+                       nRange=None, directory=TABLE_DIR, resolution="exact"):
+    entry = findSecurityLevels(scheme, redCostModel, redShapeModel, algorithm, version, nRange, directory,
+                               resolution)
+    return entry["lowestN"], np.load(os.path.join(directory, entry["file"]), mmap_mode="r")
+
+
+# Compute the cost of post-processing for all n in nValues and store it in the table store
+def buildSecurityLevelTable(parameters, nValues, checkpointFile=None, jobs=None, warmStart=False,
+                            redCostModel=None, redShapeModel="gsa", directory=TABLE_DIR):
+    nValues = list(range(min(nValues), max(nValues) + 1))
+    securityLevels = sweepSecurityLevels(parameters, nValues, checkpointFile, jobs, warmStart,
+                                         redCostModel=redCostModel, redShapeModel=redShapeModel)
+    return saveSecurityLevels(securityLevels, nValues[0], schemeName(parameters), redCostModel, redShapeModel,
+                              directory=directory)
+
+
+# A piecewise linear model of the log2 cost of post-processing, given by its values at the knots.
+# maxCheckedError is the largest interpolation error found at the check points while refining the model, see
+# adaptiveSecurityLevels. It is not a bound: the costs from the estimator are not smooth in n (β and d are
+# integers), so the error at the n that were not checked can be larger.
+@dataclass(frozen=True)
+class PiecewiseLinearSecurityLevels:
+    knots: tuple
+    securityLevels: tuple
+    maxCheckedError: float
+
+    @property
+    def lowestN(self):
+        return self.knots[0]
+
+    @property
+    def highestN(self):
+        return self.knots[-1]
+
+    def __call__(self, n):
+        return np.interp(n, self.knots, self.securityLevels)
+
+    # The interpolated log2 costs for n = lowestN, lowestN + 1, ..., highestN, as stored in the table store
+    def table(self):
+        return self(np.arange(self.lowestN, self.highestN + 1))
+
+
+# Build a piecewise linear model of the log2 costs for lowestN <= n <= highestN, starting from a grid with
+# spacing coarseStep. evaluate(nValues) returns the log2 costs for a list of n values.
+# Every interval of the grid is checked at its midpoint and its quarter points against the line through its
+# end points. Intervals where the error at any check point exceeds tolerance are split at the midpoint and
+# checked again, reusing the quarter points as the midpoints of the halves. All check points of a refinement
+# level are evaluated in one call to evaluate.
+def adaptiveSecurityLevels(evaluate, lowestN, highestN, tolerance=0.1, coarseStep=32):
+    knots = sorted(set(range(lowestN, highestN, coarseStep)) | {highestN})
+    values = dict(zip(knots, evaluate(knots)))
+    intervals = list(zip(knots, knots[1:]))
+    maxCheckedError = 0.0
+    while intervals:
+        intervals = [(a, b) for a, b in intervals if b - a > 1] # Neighbouring n are interpolated exactly
+        checkPoints = [sorted({(a + b)//2, (3*a + b)//4, (a + 3*b)//4} - {a, b}) for a, b in intervals]
+        new = sorted({n for points in checkPoints for n in points} - set(values))
+        if new:
+            values.update(zip(new, evaluate(new)))
+
+        refine = []
+        for (a, b), points in zip(intervals, checkPoints):
+            error = max(abs(values[n] - values[a] - (values[b] - values[a])*(n - a)/(b - a)) for n in points)
+            if error > tolerance:
+                m = (a + b)//2
+                refine += [(a, m), (m, b)]
+            else:
+                maxCheckedError = max(maxCheckedError, error)
+        intervals = refine
+
+    knots = sorted(values)
+    return PiecewiseLinearSecurityLevels(tuple(knots), tuple(float(values[n]) for n in knots), maxCheckedError)
+
+
+# Adaptively estimate the cost of post-processing for lowestN <= n <= highestN, see adaptiveSecurityLevels.
+# The estimator calls of each refinement level run in a pool of processes and are appended to checkpointFile.
+def sweepAdaptiveSecurityLevels(parameters, lowestN, highestN, tolerance=0.1, coarseStep=32, checkpointFile=None,
+                                jobs=None, redCostModel=None, redShapeModel="gsa"):
+    def evaluate(nValues):
+        return sweepSecurityLevels(parameters, nValues, checkpointFile, jobs, redCostModel=redCostModel,
+                                   redShapeModel=redShapeModel)
+    return adaptiveSecurityLevels(evaluate, lowestN, highestN, tolerance, coarseStep)
+
+
+# Adaptively compute the cost of post-processing for lowestN <= n <= highestN and store the interpolated
+# table in the table store, next to an exact table for the same n as resolution "approx". The index entry
+# records the number of estimator calls and the largest error found at the check points, which is not a bound
+# on the error of the table.
+def buildAdaptiveSecurityLevelTable(parameters, lowestN, highestN, tolerance=0.1, coarseStep=32,
+                                    checkpointFile=None, jobs=None, redCostModel=None, redShapeModel="gsa",
+                                    directory=TABLE_DIR):
+    model = sweepAdaptiveSecurityLevels(parameters, lowestN, highestN, tolerance, coarseStep, checkpointFile, jobs,
+                                        redCostModel, redShapeModel)
+    metadata = {"knots": len(model.knots), "maxCheckedError": model.maxCheckedError}
+    return saveSecurityLevels(model.table(), lowestN, schemeName(parameters), redCostModel, redShapeModel,
+                              directory=directory, metadata=metadata, resolution="approx")
+
+
+# The post-processing algorithms the attacker can choose from, configured as in LWE.estimate.
+# "hybrid" is the primal BDD hybrid without MITM, "dual_hybrid" the dual hybrid without MITM.
+ALGORITHMS = ("usvp", "bdd", "hybrid", "dual_hybrid")
+
+
+def postProcessingAlgorithm(algorithm, redCostModel=None, redShapeModel="gsa"):
+    from functools import partial
+    from estimator import LWE
+    from estimator.conf import red_cost_model
+
+    if redCostModel is None:
+        redCostModel = red_cost_model
+
+    if algorithm == "usvp":
+        return partial(LWE.primal_usvp, red_cost_model=redCostModel, red_shape_model=redShapeModel)
+    if algorithm == "bdd":
+        return partial(LWE.primal_bdd, red_cost_model=redCostModel, red_shape_model=redShapeModel)
+    if algorithm == "hybrid":
+        return partial(LWE.primal_hybrid, mitm=False, babai=False, red_cost_model=redCostModel,
+                       red_shape_model=redShapeModel)
+    if algorithm == "dual_hybrid":
+        return partial(LWE.dual_hybrid, red_cost_model=redCostModel, mitm_optimization=False)
+    raise ValueError(f"Unknown post-processing algorithm '{algorithm}', expected one of {ALGORITHMS}.")
+
+
+# Estimate the cost of post-processing n coefficients with one algorithm. Like LWE.estimate, an algorithm
+# that fails for these parameters is not an option for the attacker and gets infinite cost.
+def estimateAlgorithmSecurityLevel(parameters, n, algorithm, redCostModel=None, redShapeModel="gsa"):
+    try:
+        cost = postProcessingAlgorithm(algorithm, redCostModel, redShapeModel)(parameters.updated(n=n))
+    except Exception:
+        return n, algorithm, math.inf
+    return n, algorithm, float(cost["rop"].log2())
+
+
+def _estimateAlgorithmSecurityLevel(args):
+    _quietEstimator()
+    return estimateAlgorithmSecurityLevel(*args)
+
+
+# Estimate the cost of post-processing with every algorithm for all n in nValues, running all (n, algorithm)
+# pairs concurrently in a pool of processes. Each finished pair is appended to checkpointFile.
+# Returns the cheapest cost for every n and the algorithm that achieves it.
+def sweepMultiModelSecurityLevels(parameters, nValues, algorithms=ALGORITHMS, checkpointFile=None, jobs=None,
+                                  redCostModel=None, redShapeModel="gsa"):
+    if jobs is None:
+        jobs = os.cpu_count()
+
+    header = checkpointHeader(parameters, redCostModel, redShapeModel) + " multi-model"
+    finished = readCheckpoint(checkpointFile, header, keyFields=2)
+    # Larger n are more expensive, so start with them to balance the load at the end of the sweep
+    tasks = [(parameters, n, algorithm, redCostModel, redShapeModel) for n in sorted(set(nValues), reverse=True)
+             for algorithm in algorithms if (n, algorithm) not in finished]
+
+    checkpoint = None
+    if checkpointFile is not None:
+        checkpoint = openCheckpoint(checkpointFile, header)
+
+    try:
+        for n, algorithm, securityLevel in workerPool(jobs).imap_unordered(_estimateAlgorithmSecurityLevel, tasks):
+            finished[(n, algorithm)] = securityLevel
+            if checkpoint is not None:
+                checkpoint.write(f"{n} {algorithm} {securityLevel!r}\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    # Ties go to the first algorithm in algorithms
+    winners = [min(algorithms, key=lambda algorithm: finished[(n, algorithm)]) for n in nValues]
+    return [finished[(n, winner)] for n, winner in zip(nValues, winners)], winners
+
+
+# Compute the cheapest cost of post-processing over several algorithms for all n in nValues and store it in
+# the table store as algorithm "best". The index entry lists the winning algorithms as runs [first n, algorithm].
+def buildMultiModelSecurityLevelTable(parameters, nValues, algorithms=ALGORITHMS, checkpointFile=None, jobs=None,
+                                      redCostModel=None, redShapeModel="gsa", directory=TABLE_DIR):
+    nValues = list(range(min(nValues), max(nValues) + 1))
+    securityLevels, winners = sweepMultiModelSecurityLevels(parameters, nValues, algorithms, checkpointFile, jobs,
+                                                            redCostModel, redShapeModel)
+    runs = [[n, winner] for i, (n, winner) in enumerate(zip(nValues, winners)) if i == 0 or winners[i - 1] != winner]
+    metadata = {"algorithms": list(algorithms), "winners": runs}
+    return saveSecurityLevels(securityLevels, nValues[0], schemeName(parameters), redCostModel, redShapeModel, "best",
+                              directory=directory, metadata=metadata)
+
+
+# The winning algorithm for n = lowestN, lowestN + 1, ... of a table built by buildMultiModelSecurityLevelTable
+def loadWinningAlgorithms(scheme, redCostModel="MATZOV", redShapeModel="gsa", version=None, nRange=None,
+                          directory=TABLE_DIR):
+    entry = findSecurityLevels(scheme, redCostModel, redShapeModel, "best", version, nRange, directory)
+    ends = [n for n, _ in entry["winners"][1:]] + [entry["highestN"] + 1]
+    return [winner for (n, winner), end in zip(entry["winners"], ends) for _ in range(n, end)]
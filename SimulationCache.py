@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of simulation results, see MismatchSimulator.py.
+
+A simulation is identified by a hash of its full configuration (eta, query depths, trials, seed and batch size)
+and of the simulator source code, so results are reused exactly when rerunning would reproduce them. The
+statistics of every p are stored on their own, with a seed derived from the seed of the configuration and p,
+so a request for p = 1, ..., 256 reuses an earlier run for p = 1, ..., 128 and only simulates the rest.
+
+    data/simulationCache/<hash>/config.json
+    data/simulationCache/<hash>/p001.json, p002.json, ...
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from CoefficientTables import saveCoeffPerQuery
+from MismatchSimulator import accumulateStatistics, coeffPerQuery
+from QueryTrees import loadQueryTree
+from StreamingStatistics import RecoveryStatistics
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(PACKAGE_DIR, "data", "simulationCache")
+
+# The source files whose changes invalidate cached results
+SIMULATOR_FILES = ("MismatchSimulator.py", "StreamingStatistics.py")
+
+
+# A short hash of the simulator source code, identifying the version that produced a result
+def simulatorHash(files=SIMULATOR_FILES):
+    h = hashlib.sha256()
+    for name in files:
+        h.update(name.encode() + b"\0")
+        with open(os.path.join(PACKAGE_DIR, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def simulationConfig(eta, trials, seed=0, queryDepths=None, batchSize=10000):
+    if queryDepths is None:
+        queryDepths = loadQueryTree(eta).depths
+    return {"eta": eta, "queryDepths": [int(depth) for depth in queryDepths], "trials": trials, "seed": seed,
+            "batchSize": batchSize, "version": simulatorHash()}
+
+
+def configHash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _writeJSON(path, data):
+    with open(path + f".{os.getpid()}.tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(path + f".{os.getpid()}.tmp", path)
+
+
+# The p values with cached results for config
+def cachedPValues(config, directory=CACHE_DIR):
+    path = os.path.join(directory, configHash(config))
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(name[1:4]) for name in os.listdir(path) if name.startswith("p") and name.endswith(".json"))
+
+
+# The RecoveryStatistics for every p in pValues, read from the cache if present and simulated and stored
+# otherwise. See MismatchSimulator.simulateStatistics for the arguments.
+def cachedStatistics(eta, pValues, trials=10000, seed=0, queryDepths=None, batchSize=10000, directory=CACHE_DIR):
+    config = simulationConfig(eta, trials, seed, queryDepths, batchSize)
+    path = os.path.join(directory, configHash(config))
+    os.makedirs(path, exist_ok=True)
+    if not os.path.exists(os.path.join(path, "config.json")):
+        _writeJSON(os.path.join(path, "config.json"), config)
+
+    statistics = []
+    for p in pValues:
+        resultFile = os.path.join(path, f"p{p:03d}.json")
+        if os.path.exists(resultFile):
+            with open(resultFile) as f:
+                statistics.append(RecoveryStatistics.fromJSON(json.load(f)))
+            continue
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(p,)))
+        statistics.append(accumulateStatistics(rng, eta, p, trials, config["queryDepths"], batchSize))
+        _writeJSON(resultFile, statistics[-1].toJSON())
+    return statistics
+
+
+# Expected coefficients recovered per query for partial and full recovery for every p in pValues, see
+# cachedStatistics
+def cachedCoeffPerQuery(eta, pValues, trials=10000, seed=0, queryDepths=None, batchSize=10000, directory=CACHE_DIR):
+    return coeffPerQuery(cachedStatistics(eta, pValues, trials, seed, queryDepths, batchSize, directory))
+
+
+# As MismatchSimulator.buildCoeffPerQueryTables, reusing cached results for every p
+def buildCachedCoeffPerQueryTables(scheme, eta, highestP, trials=10000, seed=0, strategy="simulated",
+                                   queryDepths=None, batchSize=10000):
+    partial, full = cachedCoeffPerQuery(eta, range(1, highestP + 1), trials, seed, queryDepths, batchSize)
+    metadata = {"eta": eta, "trials": trials, "seed": seed,
+                "cache": configHash(simulationConfig(eta, trials, seed, queryDepths, batchSize))}
+    return [saveCoeffPerQuery(partial, scheme, strategy, "partial", metadata=metadata),
+            saveCoeffPerQuery(full, scheme, strategy, "full", metadata=metadata)]
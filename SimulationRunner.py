@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sharded, reproducible runs of the mismatch attack simulator, see MismatchSimulator.py.
+
+The trials for every p are split into shards of a fixed number of trials. Every shard has its own seed,
+derived from the seed of the run and the (p, shard) pair, and writes a small summary of its results to a
+shared directory: the count, mean, M2 and histogram of each simulated quantity, see StreamingStatistics.py.
+Shards can be run by a process pool, by several machines sharing the directory, or both. The merge step combines the summaries
+in a fixed order, so the resulting tables are bit-identical however the shards were run. Example:
+
+    python SimulationRunner.py init run1024 --eta 2 --highest-p 256 --trials 100000
+    python SimulationRunner.py run run1024 --part 0/2      # on the first machine
+    python SimulationRunner.py run run1024 --part 1/2      # on the second machine
+    python SimulationRunner.py merge run1024 --scheme Kyber1024
+"""
+
+import argparse
+import json
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from CoefficientTables import saveCoeffPerQuery
+from MismatchSimulator import coeffPerQuery, simulateTrials
+from QueryTrees import loadQueryTree
+from StreamingStatistics import RecoveryStatistics
+
+
+def readConfig(directory):
+    with open(os.path.join(directory, "config.json")) as f:
+        return json.load(f)
+
+
+# Create a run in directory. The trials for every p are split into shards of trialsPerShard trials.
+def initRun(directory, eta, highestP, trials, trialsPerShard=1000, seed=0, queryDepths=None):
+    if queryDepths is None:
+        queryDepths = loadQueryTree(eta).depths
+    config = {"eta": eta, "highestP": highestP, "trials": trials, "trialsPerShard": trialsPerShard, "seed": seed,
+              "queryDepths": [int(depth) for depth in queryDepths]}
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "config.json")
+    if os.path.exists(path):
+        if readConfig(directory) != config:
+            raise ValueError(f"{directory} already holds a run with a different configuration.")
+        return config
+    with open(path + ".tmp", "w") as f:
+        json.dump(config, f, indent=1)
+    os.replace(path + ".tmp", path)
+    return config
+
+
+# All shards of a run as (p, shard index, number of trials)
+def shards(config):
+    trials, trialsPerShard = config["trials"], config["trialsPerShard"]
+    return [(p, i, min(trialsPerShard, trials - i*trialsPerShard))
+            for p in range(1, config["highestP"] + 1) for i in range(-(-trials//trialsPerShard))]
+
+
+def shardFile(directory, p, index):
+    return os.path.join(directory, f"p{p:03d}-shard{index:05d}.json")
+
+
+# Simulate one shard and write its summaries. The seed only depends on the run and the shard.
+def runShard(directory, config, p, index, trials):
+    rng = np.random.default_rng(np.random.SeedSequence(config["seed"], spawn_key=(p, index)))
+    statistics = RecoveryStatistics()
+    statistics.add(*simulateTrials(rng, config["eta"], p, trials, config["queryDepths"]))
+
+    path = shardFile(directory, p, index)
+    with open(path + f".{os.getpid()}.tmp", "w") as f:
+        json.dump(statistics.toJSON(), f)
+    os.replace(path + f".{os.getpid()}.tmp", path)
+
+
+def _runShard(args):
+    runShard(*args)
+
+
+# Run the shards of the run in directory that are not finished yet, using jobs processes (default: all cores).
+# With parts > 1, only every parts-th shard starting at part is run, so several machines can share the run.
+def runShards(directory, jobs=None, part=0, parts=1):
+    config = readConfig(directory)
+    tasks = [(directory, config, p, index, trials) for n, (p, index, trials) in enumerate(shards(config))
+             if n % parts == part and not os.path.exists(shardFile(directory, p, index))]
+    with Pool(jobs) as pool:
+        for _ in pool.imap_unordered(_runShard, tasks):
+            pass
+    return len(tasks)
+
+
+# Merge the shard summaries of every p, in shard order. Returns a RecoveryStatistics for every p.
+# Raises FileNotFoundError if a shard is missing.
+def mergeShards(directory):
+    config = readConfig(directory)
+    merged = [RecoveryStatistics() for _ in range(config["highestP"])]
+    for p, index, _ in shards(config):
+        with open(shardFile(directory, p, index)) as f:
+            merged[p - 1] = merged[p - 1].merge(RecoveryStatistics.fromJSON(json.load(f)))
+    return merged
+
+
+# Merge the shards and store the tables for scheme in the coefficient table store
+def mergeRun(directory, scheme, strategy="simulated"):
+    config = readConfig(directory)
+    partial, full = coeffPerQuery(mergeShards(directory))
+    metadata = {key: config[key] for key in ("eta", "trials", "trialsPerShard", "seed")}
+    return [saveCoeffPerQuery(partial, scheme, strategy, "partial", metadata=metadata),
+            saveCoeffPerQuery(full, scheme, strategy, "full", metadata=metadata)]
+
+
+def parsePart(value):
+    part, parts = (int(x) for x in value.split("/"))
+    if not 0 <= part < parts:
+        raise argparse.ArgumentTypeError(f"Part {value} is not of the form i/m with 0 <= i < m.")
+    return part, parts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].split(" Example:")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser("init", help="create a run")
+    init.add_argument("directory")
+    init.add_argument("--eta", type=int, required=True)
+    init.add_argument("--highest-p", type=int, required=True)
+    init.add_argument("--trials", type=int, required=True, help="trials per p")
+    init.add_argument("--trials-per-shard", type=int, default=1000)
+    init.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="run the unfinished shards of a run")
+    run.add_argument("directory")
+    run.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: all cores)")
+    run.add_argument("--part", type=parsePart, default=(0, 1), help="run part i of m, e.g. 0/2 (default: 0/1)")
+
+    merge = commands.add_parser("merge", help="merge the shards into the coefficient table store")
+    merge.add_argument("directory")
+    merge.add_argument("--scheme", required=True, help="e.g. Kyber1024")
+    merge.add_argument("--strategy", default="simulated")
+
+    args = parser.parse_args(argv)
+    if args.command == "init":
+        initRun(args.directory, args.eta, args.highest_p, args.trials, args.trials_per_shard, args.seed)
+    elif args.command == "run":
+        runShards(args.directory, args.jobs, *args.part)
+    elif args.command == "merge":
+        mergeRun(args.directory, args.scheme, args.strategy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lexicographic optimization of the query strategy for a coefficient from CBD(eta), e.g. optimized for the worst
+case and thereafter for the average case as for the "Worst" curves in QueryPerformancePlot.py.
+
+The state of a coefficient is the set of values it can still take, a bitmask over the value indices value + eta.
+A query splits the set in two, either at a threshold as in the mismatch attack, or arbitrarily. The best query
+for every state is found by memoized dynamic programming, scoring every strategy by a tuple of objectives that
+are compared in order:
+- "worst": the largest number of queries needed for any value
+- "average": the expected number of queries
+The number of memoized states can be bounded with maxStates. Evicted states are recomputed when needed.
+
+With p positions queried in parallel, every position works through the coefficients of a block with this
+strategy, see MismatchSimulator.py. In the worst case every coefficient needs the largest number of queries,
+so the block takes ceil(256/p) times the worst case of a coefficient. Optimizing each coefficient for the worst
+case first therefore also optimizes the block for the worst case first, for every p.
+"""
+
+import functools
+import math
+
+from CoefficientTables import saveCoeffPerQuery
+from MismatchSimulator import simulateCoeffPerQuery
+from QueryTrees import nestedToQueryTree, saveQueryTree
+
+OBJECTIVES = ("worst", "average")
+
+
+# The tree of queries minimizing the objectives in order. The kind of the tree is named after the first
+# objective, e.g. "worstFirst", with "Subset" appended if the queries can be arbitrary subsets.
+def lexicographicTree(eta, objectives=OBJECTIVES, thresholdQueries=True, maxStates=None):
+    for objective in objectives:
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}', expected one of {OBJECTIVES}.")
+    weights = [math.comb(2*eta, k) for k in range(2*eta + 1)]
+
+    def splits(state, values):
+        if thresholdQueries:
+            return [sum(1 << i for i in values[:k]) for k in range(1, len(values))]
+        # Every subset containing the lowest value and not the whole state, so that mirrored splits are skipped
+        lowest = 1 << values[0]
+        rest = state & ~lowest
+        subsets, subset = [], rest
+        while True:
+            if subset | lowest != state:
+                subsets.append(subset | lowest)
+            if subset == 0:
+                return subsets
+            subset = (subset - 1) & rest
+
+    @functools.lru_cache(maxsize=maxStates)
+    def best(state): # The scores of the best strategy for state and its first query
+        values = [i for i in range(len(weights)) if (state >> i) & 1]
+        if len(values) == 1:
+            return (0,)*len(objectives), None
+        weight = sum(weights[i] for i in values) # The average is scored as a sum of depths times weights
+        bestScore, bestSplit = None, None
+        for leftMask in splits(state, values):
+            left, right = best(leftMask)[0], best(state & ~leftMask)[0]
+            score = tuple(1 + max(l, r) if objective == "worst" else weight + l + r
+                          for objective, l, r in zip(objectives, left, right))
+            if bestScore is None or score < bestScore:
+                bestScore, bestSplit = score, leftMask
+        return bestScore, bestSplit
+
+    def build(state):
+        leftMask = best(state)[1]
+        if leftMask is None:
+            return state.bit_length() - 1
+        return (build(leftMask), build(state & ~leftMask))
+
+    kind = objectives[0] + "First" + ("" if thresholdQueries else "Subset")
+    return nestedToQueryTree(eta, kind, build((1 << len(weights)) - 1))
+
+
+# Compute the worst case first tree, store it in the query tree store and simulate the coefficients per query
+# for p = 1, ..., highestP with it. The tables are stored for scheme under strategy, in the coefficient
+# table store. Trials are simulated in batches of at most batchSize to bound the memory.
+def buildWorstCoeffPerQueryTables(scheme, eta, highestP, trials=10000, seed=0, strategy="simulatedWorst",
+                                  batchSize=10000):
+    tree = lexicographicTree(eta, ("worst", "average"))
+    saveQueryTree(tree)
+    partial, full = simulateCoeffPerQuery(eta, range(1, highestP + 1), trials, seed, tree.depths, batchSize)
+    metadata = {"eta": eta, "trials": trials, "seed": seed, "queryTree": tree.kind}
+    return [saveCoeffPerQuery(partial, scheme, strategy, "partial", metadata=metadata),
+            saveCoeffPerQuery(full, scheme, strategy, "full", metadata=metadata)]
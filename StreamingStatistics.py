@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming statistics of the simulated mismatch attack, updated one batch of trials at a time without keeping
+the per-trial results.
+
+Every simulated quantity is an integer in a range that only depends on the block size and the query tree,
+e.g. the number of queries until a block is fully recovered. A summary keeps the count, mean and M2 of the
+samples together with an exact histogram, which doubles as the quantile sketch. The memory per p is thus
+bounded independently of the number of trials, and summaries of different batches, processes or machines
+can be merged.
+"""
+
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+
+
+# Count, mean, sum of squared deviations M2 and histogram of integer samples, mergeable with other summaries
+@dataclass
+class SampleSummary:
+    count: int = 0
+    mean: float = 0.0
+    M2: float = 0.0
+    histogram: dict = field(default_factory=dict)
+
+    @classmethod
+    def fromSamples(cls, samples):
+        samples = np.asarray(samples)
+        if len(samples) == 0:
+            return cls()
+        mean = float(samples.mean())
+        values, counts = np.unique(samples, return_counts=True)
+        return cls(len(samples), mean, float(((samples - mean)**2).sum()),
+                   {int(v): int(c) for v, c in zip(values, counts)})
+
+    @property
+    def variance(self):
+        return self.M2/(self.count - 1) if self.count > 1 else 0.0
+
+    # The smallest sample such that at least the fraction q of the samples are at most it
+    def quantile(self, q):
+        if self.count == 0:
+            raise ValueError("The quantile of no samples is undefined.")
+        seen = 0
+        for value, c in self.histogram.items():
+            seen += c
+            if seen >= q*self.count:
+                return value
+        return value
+
+    # The q-quantile of the largest of `blocks` independent samples, e.g. the queries until all blocks of a key
+    # are fully recovered
+    def maximumQuantile(self, q, blocks):
+        return self.quantile(q**(1/blocks))
+
+    # Combine with the summary of other samples (Chan et al.). The result depends on the order of merging,
+    # so summaries are always merged in the same order.
+    def merge(self, other):
+        count = self.count + other.count
+        if count == 0:
+            return SampleSummary()
+        delta = other.mean - self.mean
+        mean = self.mean + delta*other.count/count
+        M2 = self.M2 + other.M2 + delta**2*self.count*other.count/count
+        histogram = dict(self.histogram)
+        for value, c in other.histogram.items():
+            histogram[value] = histogram.get(value, 0) + c
+        return SampleSummary(count, mean, M2, dict(sorted(histogram.items())))
+
+    # Add a batch of samples in place
+    def add(self, samples):
+        merged = self.merge(SampleSummary.fromSamples(samples))
+        self.count, self.mean, self.M2, self.histogram = merged.count, merged.mean, merged.M2, merged.histogram
+
+    def toJSON(self):
+        return {"count": self.count, "mean": self.mean, "M2": self.M2, "histogram": list(self.histogram.items())}
+
+    @classmethod
+    def fromJSON(cls, data):
+        return cls(data["count"], data["mean"], data["M2"], {int(v): int(c) for v, c in data["histogram"]})
+
+
+# The summaries of the quantities simulated for one p, as returned by MismatchSimulator.simulateBlocks:
+# the queries until the block is fully recovered, and the queries until the first position runs idle
+# together with the coefficients recovered by then, for partial recovery
+@dataclass
+class RecoveryStatistics:
+    fullQueries: SampleSummary = field(default_factory=SampleSummary)
+    partialQueries: SampleSummary = field(default_factory=SampleSummary)
+    partialRecovered: SampleSummary = field(default_factory=SampleSummary)
+
+    # Add the results of a batch of trials in place
+    def add(self, fullQueries, partialQueries, partialRecovered):
+        self.fullQueries.add(fullQueries)
+        self.partialQueries.add(partialQueries)
+        self.partialRecovered.add(partialRecovered)
+
+    def merge(self, other):
+        return RecoveryStatistics(*(getattr(self, f.name).merge(getattr(other, f.name)) for f in fields(self)))
+
+    def toJSON(self):
+        return {f.name: getattr(self, f.name).toJSON() for f in fields(self)}
+
+    @classmethod
+    def fromJSON(cls, data):
+        return cls(*(SampleSummary.fromJSON(data[f.name]) for f in fields(cls)))
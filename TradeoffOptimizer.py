@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized optimization of the tradeoff between mismatch queries and post-processing.
+
+Every strategy is evaluated on the whole grid of schemes, query budgets and parallelization levels p
+at once. A strategy gives, for every grid point, the number of queries actually used, the number of
+recovered coefficients and whether the point is allowed. The grids follow the scalar optimizers in
+QueryComplexityTradeoff.py. All costs are in log2.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from CoefficientTables import loadCoeffPerQuery
+from MismatchSimulator import groupQueries
+from SecurityLevels import loadSecurityLevels
+
+
+@dataclass(frozen=True)
+class KyberScheme:
+    """
+    Everything the tradeoff optimizer needs to know about a version of Kyber.
+    """
+
+    name: str
+    l: int # The number of 256 blocks in the secret key
+    eta: int # The coefficients of the secret key are sampled from CBD(eta)
+    securityLevelTable: str # The scheme of the security level table used for post-processing
+    coeffStrategy: str = "adaptive" # The simulated strategy in the coefficient table store
+    postProcessing: str = "bdd" # The post-processing algorithm of the security level table, or "best"
+    maxGroupSize: int = 2 # The largest groups of positions tried by the non-adaptive baseline
+
+    # Groups of more than KyberOracle.MAX_GROUP_SIZE positions are not supported, see validateGroupSizes
+    def __post_init__(self):
+        if self.maxGroupSize > 2:
+            from KyberOracle import MAX_GROUP_SIZE
+            if self.maxGroupSize > MAX_GROUP_SIZE:
+                raise ValueError(f"Groups of more than {MAX_GROUP_SIZE} positions are not supported.")
+
+    # Groups of more than 2 positions are only allowed if KyberOracle recovers them in queriesPerGroup queries.
+    # Raises ValueError otherwise. The result is cached per process, see KyberOracle.validateGroupSize.
+    def validateGroupSizes(self):
+        from KyberOracle import validateGroupSize
+        for k in range(3, self.maxGroupSize + 1):
+            if not validateGroupSize(self.name, k):
+                raise ValueError(f"Groups of {k} positions of {self.name} are not recovered in "
+                                 f"{self.queriesPerGroup(k)} queries through KyberOracle.")
+
+    @property
+    def n(self):
+        return self.l*256
+
+    # Recovered coefficients per query of the adaptive approach for p = 1, 2, ..., read when first needed
+    @property
+    def coeffPerQuery(self):
+        return loadCoeffPerQuery(self.name, self.coeffStrategy, "partial")
+
+    @property
+    def highestP(self):
+        return len(self.coeffPerQuery)
+
+    # The fraction of all entries that are 0 or -1 and thus recovered in 2 queries
+    @property
+    def twoQueryFraction(self):
+        return (math.comb(2*self.eta, self.eta) + math.comb(2*self.eta, self.eta - 1))/4**self.eta
+
+    # The number of queries that recover a group of k positions non-adaptively, e.g. 5 for pairs from CBD(2)
+    def queriesPerGroup(self, k):
+        return groupQueries(self.eta, k)
+
+
+def _grid(queries, pValues):
+    return np.asarray(queries)[:, None], np.asarray(pValues)[None, :]
+
+
+# One value per scheme, shaped to broadcast against the (scheme, query budget, p) grid
+def _perScheme(values, dtype=np.int64):
+    return np.array(values, dtype=dtype).reshape(-1, 1, 1)
+
+
+# Non-adaptive, every group of k positions is recovered in groupQueries queries, with at most 256//k groups in
+# parallel. groupQueries can have one entry per scheme. If k does not divide 256, the smaller group that is
+# left over is not used.
+def groupParallelGrid(queries, pValues, l, k, groupQueries):
+    queries, p = _grid(queries, pValues)
+    used = queries//groupQueries*groupQueries # Queries need to come in multiples of groupQueries
+    rounds = used//groupQueries
+    recovered = rounds*p*k*np.ones_like(l)
+    valid = (p == 1) | ((p <= 256//k) & (-(-rounds//l)*k*p <= 256))
+    return np.broadcast_to(used, recovered.shape), recovered, valid
+
+
+# Non-adaptive, every position is recovered in 3 queries
+def onePositionParallelGrid(queries, pValues, l):
+    return groupParallelGrid(queries, pValues, l, 1, 3)
+
+
+# Non-adaptive, every pair of positions is recovered in 5 queries
+def pairwiseParallelGrid(queries, pValues, l):
+    return groupParallelGrid(queries, pValues, l, 2, 5)
+
+
+def groupStrategyName(k):
+    return {1: "onePosition", 2: "pairwise"}.get(k, f"group{k}")
+
+
+# Adaptive, recovering coeffPerQuery[p - 1] positions per query on average.
+# With several schemes, coeffPerQuery has one row per scheme and highestP gives the length of each row.
+def adaptiveParallelGrid(queries, pValues, l, coeffPerQuery, highestP):
+    queries, p = _grid(queries, pValues)
+    coeffPerQuery = np.asarray(coeffPerQuery, dtype=np.float64)
+    if coeffPerQuery.ndim == 1:
+        coeff = coeffPerQuery[np.minimum(p, len(coeffPerQuery)) - 1]
+    else:
+        schemes = np.arange(len(coeffPerQuery))[:, None, None]
+        coeff = coeffPerQuery[schemes, np.minimum(p, coeffPerQuery.shape[1]) - 1]
+    recovered = np.rint(coeff*queries).astype(np.int64)
+    valid = (p == 1) | ((p <= highestP) & (np.rint(coeff)/l*queries <= 256 - p))
+    return np.broadcast_to(queries, recovered.shape), recovered, valid
+
+
+# Two queries, the positions in recoveredFraction are recovered, e.g. all entries that are 0 or -1
+def twoQueryParallelGrid(queries, pValues, recoveredFraction, highestP):
+    queries, p = _grid(queries, pValues)
+    recovered = np.rint(recoveredFraction*p).astype(np.int64)
+    valid = p <= highestP
+    shape = np.broadcast_shapes(queries.shape, recovered.shape)
+    return np.broadcast_to(queries, shape), np.broadcast_to(recovered, shape), np.broadcast_to(valid, shape)
+
+
+# log2 of the cost of the queries, -inf if no queries are used
+def queryCostGrid(used, costPerKey, pValues):
+    p = np.asarray(pValues)
+    with np.errstate(divide="ignore"):
+        return np.log2(used) + math.log2(costPerKey) + (p - 1)
+
+
+# log2 of the cost of every grid point, with infinity for points that are not allowed.
+# The query and post-processing costs are combined with a stable log-sum-exp.
+# securityLevels has one row per scheme, lowestN and n have one entry per scheme.
+def evaluateGrid(securityLevels, lowestN, n, costPerKey, pValues, used, recovered, valid):
+    schemes = np.arange(len(securityLevels)).reshape(-1, 1, 1)
+    index = np.maximum(0, n - recovered - lowestN)
+    cost = np.logaddexp2(queryCostGrid(used, costPerKey, pValues), securityLevels[schemes, index])
+    return np.where(valid, cost, np.inf)
+
+
+# Find the cheapest strategy and p for every scheme and query budget.
+# strategies is a list of (name, used, recovered, valid, applies) where applies masks the query budgets
+# the strategy is used for. Budgets without any strategy only pay for the post-processing.
+# Strategies are tried in order and p in increasing order, so ties go to the first candidate.
+def optimizeGrid(securityLevels, lowestN, n, queries, costPerKey, pValues, strategies):
+    queries = np.asarray(queries)
+    pValues = np.asarray(pValues)
+    securityLevels = np.atleast_2d(securityLevels)
+    lowestN = _perScheme(lowestN)
+    n = _perScheme(n)
+
+    shape = (len(securityLevels), len(queries))
+    gridShape = (*shape, len(pValues))
+    noQueries = securityLevels[np.arange(shape[0]), np.maximum(0, n - lowestN)[:, 0, 0]]
+    cost = np.broadcast_to(noQueries[:, None], shape)
+    p = np.zeros(shape, dtype=np.int64)
+    recovered = np.zeros(shape, dtype=np.int64)
+    strategy = np.full(shape, None, dtype=object)
+    chosen = np.zeros(shape, dtype=bool)
+
+    for name, used, strategyRecovered, valid, applies in strategies:
+        strategyRecovered = np.broadcast_to(strategyRecovered, gridShape)
+        grid = evaluateGrid(securityLevels, lowestN, n, costPerKey, pValues, np.broadcast_to(used, gridShape),
+                            strategyRecovered, valid)
+        best = np.argmin(grid, axis=-1)[..., None]
+        bestCost = np.take_along_axis(grid, best, -1)[..., 0]
+        better = applies & (~chosen | (bestCost < cost))
+        cost = np.where(better, bestCost, cost)
+        p = np.where(better, pValues[best[..., 0]], p)
+        recovered = np.where(better, np.take_along_axis(strategyRecovered, best, -1)[..., 0], recovered)
+        strategy[better] = name
+        chosen |= np.broadcast_to(applies, shape)
+
+    return {"queries": queries, "cost": cost, "p": p, "recovered": recovered, "strategy": strategy}
+
+
+# The combined strategies of optimizeCostParallelAll for all schemes and query budgets at once:
+# - at most 1 query: post-processing only
+# - 2 queries: the entries that are 0 or -1 are recovered
+# - 3 queries: one positional parallel
+# - 4 or more queries: the cheapest of the non-adaptive baseline, with groups of k = 1, ..., maxGroupSize
+#   positions (one positional parallel, pairwise parallel, ...), and the adaptive approach
+# Each security level table is loaded once and shared between the schemes that use it. Already loaded
+# tables can be given as a dictionary from (table name, post-processing algorithm) to (lowestN, securityLevels).
+# The group sizes of the schemes are validated first, unless validate is False because the caller already did.
+# Returns a dictionary from scheme name to the optimized curve.
+def optimizeSchemes(schemes, queries, costPerKey, securityLevelTables=None, validate=True):
+    if securityLevelTables is None:
+        securityLevelTables = {}
+    for scheme in schemes:
+        if validate:
+            scheme.validateGroupSizes()
+        key = (scheme.securityLevelTable, scheme.postProcessing)
+        if key not in securityLevelTables:
+            securityLevelTables[key] = loadSecurityLevels(scheme.securityLevelTable, algorithm=scheme.postProcessing)
+
+    queries = np.asarray(queries)
+    pValues = np.arange(1, 256 + 1)
+
+    tables = [securityLevelTables[(scheme.securityLevelTable, scheme.postProcessing)] for scheme in schemes]
+    securityLevels = np.full((len(schemes), max(len(table) for _, table in tables)), np.inf)
+    for i, (_, table) in enumerate(tables):
+        securityLevels[i, :len(table)] = table
+    coeffPerQuery = np.zeros((len(schemes), max(scheme.highestP for scheme in schemes)))
+    for i, scheme in enumerate(schemes):
+        coeffPerQuery[i, :scheme.highestP] = scheme.coeffPerQuery
+
+    lowestN = _perScheme([lowestN for lowestN, _ in tables])
+    n = _perScheme([scheme.n for scheme in schemes])
+    l = _perScheme([scheme.l for scheme in schemes])
+    highestP = _perScheme([scheme.highestP for scheme in schemes])
+    twoQueryFraction = _perScheme([scheme.twoQueryFraction for scheme in schemes], np.float64)
+
+    strategies = [
+        ("twoQuery", *twoQueryParallelGrid(queries, pValues, twoQueryFraction, highestP), queries == 2),
+        ("onePosition", *onePositionParallelGrid(queries, pValues, l), queries == 3),
+    ]
+    for k in range(1, max(scheme.maxGroupSize for scheme in schemes) + 1):
+        groupQueries = _perScheme([scheme.queriesPerGroup(k) for scheme in schemes])
+        applies = (_perScheme([k <= scheme.maxGroupSize for scheme in schemes], bool)[:, :, 0]
+                   & (queries >= np.maximum(4, groupQueries[:, :, 0])))
+        strategies.append((groupStrategyName(k), *groupParallelGrid(queries, pValues, l, k, groupQueries), applies))
+    strategies.append(("adaptive", *adaptiveParallelGrid(queries, pValues, l, coeffPerQuery, highestP), queries >= 4))
+    result = optimizeGrid(securityLevels, lowestN, n, queries, costPerKey, pValues, strategies)
+    return {scheme.name: {key: value if key == "queries" else value[i] for key, value in result.items()}
+            for i, scheme in enumerate(schemes)}
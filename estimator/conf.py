@@ -11,3 +11,10 @@ red_cost_model_classical_poly_space = RC.ABLR21
 red_shape_model = "gsa"
 red_simulator = GSA
 mitm_opt = "analytical"
+# optimizer for integer parameters, "local_minimum" or "fibonacci", and overrides per call site, e.g.
+# optimizers["dual_hybrid.zeta"] = "fibonacci", see util.minimizer(). The call sites are usvp.beta_gsa,
+# usvp.beta, usvp.d, hybrid.beta, hybrid.d, hybrid.zeta, dual.t, dual.beta, dual_hybrid.h1, dual_hybrid.zeta,
+# guess.dense_zeta, guess.sparse_zeta, mitm.m, mitm.k, bkw.b and bkw.t2. The warm-started brackets
+# (usvp.beta_gsa_warm, usvp.beta_warm, hybrid.beta_warm) are always searched linearly.
+optimizer = "local_minimum"
+optimizers = {}
@@ -22,6 +22,7 @@ class Cost:
         "repetitions": False,
         "tag": False,
         "problem": False,
+        "baseline": False,
     }
 
     @classmethod
@@ -83,7 +84,9 @@ class Cost:
         d = self.__dict__
         s = []
         for k, v in d.items():
-            if k == "problem":  # we store the problem instance in a cost object for reference
+            # we store the problem instance and the uSVP baseline of the hybrid attack in a cost object
+            # for reference
+            if k in ("problem", "baseline"):
                 continue
             kk = wfmtf(self.key_map.get(k, k))
             try:
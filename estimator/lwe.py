@@ -14,7 +14,7 @@ from .lwe_parameters import LWEParameters as Parameters  # noqa
 
 class Estimate:
     @classmethod
-    def rough(cls, params, jobs=1, catch_exceptions=True):
+    def rough(cls, params, jobs=1, catch_exceptions=True, timeout=None):
         """
         This function makes the following somewhat routine assumptions:
 
@@ -29,8 +29,9 @@ class Estimate:
         - BKW is not competitive.
 
         :param params: LWE parameters.
-        :param jobs: Use multiple threads in parallel.
+        :param jobs: Use multiple processes in parallel.
         :param catch_exceptions: When an estimate fails, just print a warning.
+        :param timeout: Give up on an algorithm after this many seconds of wall-clock time.
 
         EXAMPLE ::
 
@@ -75,7 +76,12 @@ class Estimate:
                 algorithms["arora-gb"] = arora_gb.cost_bounded
 
         res_raw = batch_estimate(
-            params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
+            params,
+            algorithms.values(),
+            log_level=1,
+            jobs=jobs,
+            catch_exceptions=catch_exceptions,
+            timeout=timeout,
         )
         res_raw = res_raw[params]
         res = {}
@@ -101,6 +107,7 @@ class Estimate:
         add_list=tuple(),
         jobs=1,
         catch_exceptions=True,
+        timeout=None,
     ):
         """
         Run all estimates.
@@ -110,8 +117,9 @@ class Estimate:
         :param red_shape_model: How to model the shape of a reduced basis (applies to primal attacks)
         :param deny_list: skip these algorithms
         :param add_list: add these ``(name, function)`` pairs to the list of algorithms to estimate.a
-        :param jobs: Use multiple threads in parallel.
+        :param jobs: Use multiple processes in parallel.
         :param catch_exceptions: When an estimate fails, just print a warning.
+        :param timeout: Give up on an algorithm after this many seconds of wall-clock time.
 
         EXAMPLE ::
 
@@ -180,7 +188,12 @@ class Estimate:
             algorithms[k] = v
 
         res_raw = batch_estimate(
-            params, algorithms.values(), log_level=1, jobs=jobs, catch_exceptions=catch_exceptions
+            params,
+            algorithms.values(),
+            log_level=1,
+            jobs=jobs,
+            catch_exceptions=catch_exceptions,
+            timeout=timeout,
         )
         res_raw = res_raw[params]
         res = {}
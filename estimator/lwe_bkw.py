@@ -4,7 +4,7 @@ See :ref:`Coded-BKW for LWE` for what is available.
 """
 from sage.all import ZZ, ceil, log, floor, sqrt, var, find_root, erf, oo
 from .lwe_parameters import LWEParameters
-from .util import local_minimum
+from .util import minimizer
 from .cost import Cost
 from .errors import InsufficientSamplesError
 from .prob import amplify_sigma
@@ -224,11 +224,11 @@ class CodedBKW:
 
         # the outer search is over b, which determines the size of the tables: q^b
         b_max = 3 * ceil(log(params.q, 2))
-        with local_minimum(2, b_max, smallerf=sf) as it_b:
+        with minimizer("bkw.b", 2, b_max, smallerf=sf) as it_b:
             for b in it_b:
                 # the inner search is over t2, the number of coded steps
                 t2_max = min(params.n // b, ceil(3 * log(params.q, 2)))
-                with local_minimum(2, t2_max, smallerf=sf) as it_t2:
+                with minimizer("bkw.t2", 2, t2_max, smallerf=sf) as it_t2:
                     for t2 in it_t2:
                         y = cls.cost(b=b, t2=t2, ntest=ntest, params=params)
                         it_t2.update(y)
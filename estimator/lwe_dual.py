@@ -11,7 +11,7 @@ from dataclasses import replace
 
 from sage.all import oo, ceil, sqrt, log, cached_function, RR, exp, pi
 from .reduction import delta as deltaf
-from .util import local_minimum
+from .util import in_worker, minimizer, worker_pool
 from .cost import Cost
 from .lwe_parameters import LWEParameters
 from .prob import drop as prob_drop
@@ -282,7 +282,7 @@ class DualHybrid:
         if fft:
 
             def f(beta):
-                with local_minimum(0, params.n - zeta) as it:
+                with minimizer("dual.t", 0, params.n - zeta) as it:
                     for t in it:
                         it.update(f_t(beta=beta, t=t))
                     return it.y
@@ -297,7 +297,7 @@ class DualHybrid:
         beta = beta_upper
         while beta == beta_upper:
             beta_upper *= 2
-            with local_minimum(40, beta_upper, opt_step) as it:
+            with minimizer("dual.beta", 40, beta_upper, opt_step) as it:
                 for beta in it:
                     it.update(f(beta=beta))
                 for beta in it.neighborhood:
@@ -310,6 +310,46 @@ class DualHybrid:
             cost["h1"] = h1
         return cost
 
+    @staticmethod
+    def optimize_blocksize_sparse(
+        solver,
+        params: LWEParameters,
+        zeta: int = 0,
+        success_probability: float = 0.99,
+        red_cost_model=red_cost_model_default,
+        use_lll=True,
+        log_level=None,
+        fft=False,
+    ):
+        """
+        Optimizes the cost of the dual hybrid attack over the block size β and the splitting weight h1
+        for sparse secrets.
+
+        .. note :: This function assumes that the instance is normalized. ζ is fixed, ``fft`` is ignored.
+
+        """
+        h = params.Xs.get_hamming_weight(params.n)
+        h1_min = max(0, h - (params.n - zeta))
+        h1_max = min(zeta, h)
+        if h1_min == h1_max:
+            h1_max = h1_min + 1
+        Logging.log("dual", log_level, f"h1 ∈ [{h1_min},{h1_max}] (zeta={zeta})")
+        with minimizer("dual_hybrid.h1", h1_min, h1_max, log_level=log_level + 1) as it:
+            for h1 in it:
+                # ignoring fft on purpose for sparse secrets
+                cost = DualHybrid.optimize_blocksize(
+                    h1=h1,
+                    solver=solver,
+                    params=params,
+                    zeta=zeta,
+                    success_probability=success_probability,
+                    red_cost_model=red_cost_model,
+                    use_lll=use_lll,
+                    log_level=log_level + 2,
+                )
+                it.update(cost)
+            return it.y
+
     def __call__(
         self,
         solver,
@@ -320,6 +360,7 @@ class DualHybrid:
         opt_step=8,
         log_level=1,
         fft=False,
+        jobs=1,
     ):
         """
         Optimizes the cost of the dual hybrid attack (using the given solver) over
@@ -338,6 +379,8 @@ class DualHybrid:
         :param use_lll: use LLL calls to produce more small vectors [EC:Albrecht17]_
         :param opt_step: control robustness of optimizer
         :param fft: use the FFT distinguisher from [AC:GuoJoh21]_. (ignored for sparse secrets)
+        :param jobs: evaluate candidate ζ speculatively on this many processes, the result does not
+            depend on it
 
         The returned cost dictionary has the following entries:
 
@@ -424,39 +467,7 @@ class DualHybrid:
 
         if params.Xs.is_sparse:
             Cost.register_impermanent(h1=False)
-
-            def _optimize_blocksize(
-                solver,
-                params: LWEParameters,
-                zeta: int = 0,
-                success_probability: float = 0.99,
-                red_cost_model=red_cost_model_default,
-                use_lll=True,
-                log_level=None,
-                fft=False,
-            ):
-                h = params.Xs.get_hamming_weight(params.n)
-                h1_min = max(0, h - (params.n - zeta))
-                h1_max = min(zeta, h)
-                if h1_min == h1_max:
-                    h1_max = h1_min + 1
-                Logging.log("dual", log_level, f"h1 ∈ [{h1_min},{h1_max}] (zeta={zeta})")
-                with local_minimum(h1_min, h1_max, log_level=log_level + 1) as it:
-                    for h1 in it:
-                        # ignoring fft on purpose for sparse secrets
-                        cost = self.optimize_blocksize(
-                            h1=h1,
-                            solver=solver,
-                            params=params,
-                            zeta=zeta,
-                            success_probability=success_probability,
-                            red_cost_model=red_cost_model,
-                            use_lll=use_lll,
-                            log_level=log_level + 2,
-                        )
-                        it.update(cost)
-                    return it.y
-
+            _optimize_blocksize = self.optimize_blocksize_sparse
         else:
             _optimize_blocksize = self.optimize_blocksize
 
@@ -471,12 +482,15 @@ class DualHybrid:
             fft=fft,
         )
 
-        with local_minimum(1, params.n - 1, opt_step) as it:
-            for zeta in it:
-                it.update(f(zeta=zeta))
-            for zeta in it.neighborhood:
-                it.update(f(zeta=zeta))
-            cost = it.y
+        with minimizer("dual_hybrid.zeta", 1, params.n - 1, opt_step) as it:
+            # a worker of ``batch_estimate`` cannot start processes of its own, it searches sequentially
+            if jobs > 1 and not in_worker():
+                # look ahead as many steps as there are processes for all outcomes, 2^(depth+1) - 1 points
+                cost = it.search(
+                    f, worker_pool(jobs), depth=max(1, (jobs + 1).bit_length() - 2), param="zeta", neighborhood=True
+                )
+            else:
+                cost = it.search(f, param="zeta", neighborhood=True)
 
         cost["problem"] = params
         return cost.sanity_check()
@@ -546,6 +560,7 @@ def dual_hybrid(
     mitm_optimization=False,
     opt_step=8,
     fft=False,
+    jobs=1,
 ):
     """
     Dual hybrid attack from [INDOCRYPT:EspJouKha20]_.
@@ -558,6 +573,7 @@ def dual_hybrid(
            ``conf`` module is picked, ``False`` disables MITM.
     :param opt_step: Control robustness of optimizer.
     :param fft: use the FFT distinguisher from [AC:GuoJoh21]_. (ignored for sparse secrets)
+    :param jobs: Number of processes to search over ζ with, the result does not depend on it.
 
     The returned cost dictionary has the following entries:
 
@@ -590,6 +606,7 @@ def dual_hybrid(
         use_lll=use_lll,
         opt_step=opt_step,
         fft=fft,
+        jobs=jobs,
     )
     if mitm_optimization:
         ret["tag"] = "dual_mitm_hybrid"
@@ -17,7 +17,7 @@ from .lwe_parameters import LWEParameters
 from .prob import amplify as prob_amplify
 from .prob import drop as prob_drop
 from .prob import amplify_sigma
-from .util import local_minimum
+from .util import minimizer
 from .nd import sigmaf
 
 
@@ -52,7 +52,7 @@ class guess_composition:
 
         max_zeta = min(floor(log(baseline_cost["rop"], base)), params.n)
 
-        with local_minimum(0, max_zeta, log_level=log_level) as it:
+        with minimizer("guess.dense_zeta", 0, max_zeta, log_level=log_level) as it:
             for zeta in it:
                 search_space = base ** zeta
                 cost = f(params.updated(n=params.n - zeta), log_level=log_level + 1, **kwds)
@@ -112,7 +112,7 @@ class guess_composition:
         base = params.Xs.bounds[1] - params.Xs.bounds[0]  # we exclude zero
         h = ceil(len(params.Xs) * params.Xs.density)  # nr of non-zero entries
 
-        with local_minimum(0, params.n - 40, log_level=log_level) as it:
+        with minimizer("guess.sparse_zeta", 0, params.n - 40, log_level=log_level) as it:
             for zeta in it:
                 single_cost = f(params.updated(n=params.n - zeta), log_level=log_level + 1, **kwds)
                 repeat, gamma, search_space, probability = cls.gammaf(params.n, h, zeta, base)
@@ -307,7 +307,7 @@ class MITM:
         # a reasonable starting point and then optimize around it
         m_ = ceil(max(log2(size_tab) + log2(log2(size_tab)), 1))
         a, b = self.local_range(m_)
-        with local_minimum(a, b, smallerf=lambda x, best: x[1] <= best[1]) as it:
+        with minimizer("mitm.m", a, b, smallerf=lambda x, best: x[1] <= best[1]) as it:
             for m in it:
                 # for search we effectively build a second table and for each entry, we expect
                 # 2^( m * 4 * B / q) = 2^(delta * m) table look ups + a l_oo computation (costing m)
@@ -371,7 +371,7 @@ class MITM:
         if "analytical" in optimization:
             return self.mitm_analytical(params=params, success_probability=success_probability)
         elif "numerical" in optimization:
-            with local_minimum(1, params.n - 1) as it:
+            with minimizer("mitm.k", 1, params.n - 1) as it:
                 for k in it:
                     cost = self.cost(k=k, params=params, success_probability=success_probability)
                     it.update(cost)
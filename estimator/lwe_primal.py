@@ -10,7 +10,7 @@ from functools import partial
 from sage.all import oo, ceil, sqrt, log, RR, ZZ, binomial, cached_function
 from .reduction import delta as deltaf
 from .reduction import cost as costf
-from .util import local_minimum
+from .util import linear_search, minimizer
 from .cost import Cost
 from .lwe_parameters import LWEParameters
 from .simulator import normalize as simulator_normalize
@@ -24,6 +24,32 @@ from .conf import red_shape_model as red_shape_model_default
 from .conf import red_simulator as red_simulator_default
 
 
+def _bracket_minimum(site, f, center, lower, upper, radius=2, log_level=5, cache=None):
+    """
+    Search for a β minimizing ``f`` in a bracket of width ``2·radius + 1`` around ``center``, clipped to
+    ``[lower, upper)``, the range of the full search. This warm-starts a search from the optimum of a
+    neighbouring instance. We evaluate every β in the bracket, the cost need not be unimodal there.
+
+    :param cache: evaluations of ``f``, shared with the full search.
+    :return: The cost or ``None`` if the minimum lands on an edge of the bracket that is not also an edge
+        of the full search.
+
+    """
+    start = max(lower, center - radius)
+    stop = min(center + radius + 1, upper)
+    if stop <= start:
+        return None
+    it = linear_search(start, stop, suppress_bounds_warning=True, log_level=log_level, cache=cache)
+    it.site = site
+    with it:
+        for x in it:
+            it.update(f(x))
+        cost, beta = it.y, it.x
+    if not cost or (beta == start and start > lower) or (beta == stop - 1 and stop < upper):
+        return None
+    return cost
+
+
 class PrimalUSVP:
     """
     Estimate cost of solving LWE via uSVP reduction.
@@ -135,6 +161,7 @@ class PrimalUSVP:
         red_cost_model=red_cost_model_default,
         red_shape_model=red_shape_model_default,
         optimize_d=True,
+        warm_start=None,
         log_level=1,
         **kwds,
     ):
@@ -145,6 +172,9 @@ class PrimalUSVP:
         :param red_cost_model: How to cost lattice reduction.
         :param red_shape_model: How to model the shape of a reduced basis.
         :param optimize_d: Attempt to find minimal d, too.
+        :param warm_start: Cost of a neighbouring instance, e.g. ``n - 1``, to seed the search for β. We
+            only search a small bracket around its β and fall back to the full search if the optimum
+            lands on the edge of the bracket.
         :return: A cost dictionary.
 
         The returned cost dictionary has the following entries:
@@ -182,13 +212,16 @@ class PrimalUSVP:
         m = params.m + params.n if params.Xs <= params.Xe else params.m
 
         if red_shape_model == "gsa":
-            with local_minimum(40, max(2 * params.n, 41)) as it:
-                for beta in it:
-                    cost = self.cost_gsa(
-                        beta=beta, params=params, m=m, red_cost_model=red_cost_model, **kwds
-                    )
-                    it.update(cost)
-                cost = it.y
+            f = partial(self.cost_gsa, params=params, m=m, red_cost_model=red_cost_model, **kwds)
+            beta_stop = max(2 * params.n, 41)
+            cost = None
+            if warm_start is not None:
+                cost = _bracket_minimum("usvp.beta_gsa_warm", f, warm_start["beta"], 40, beta_stop)
+            if cost is None:
+                with minimizer("usvp.beta_gsa", 40, beta_stop) as it:
+                    for beta in it:
+                        it.update(f(beta=beta))
+                    cost = it.y
             cost["tag"] = "usvp"
             cost["problem"] = params
             return cost.sanity_check()
@@ -203,6 +236,7 @@ class PrimalUSVP:
             params,
             red_cost_model=red_cost_model,
             red_shape_model="gsa",
+            warm_start=warm_start,
         )
 
         Logging.log("usvp", log_level + 1, f"GSA: {repr(cost_gsa)}")
@@ -216,20 +250,24 @@ class PrimalUSVP:
         )
 
         # step 1. find β
-
-        with local_minimum(
-            max(cost_gsa["beta"] - ceil(0.10 * cost_gsa["beta"]), 40),
-            max(cost_gsa["beta"] + ceil(0.20 * cost_gsa["beta"]), 40),
-        ) as it:
-            for beta in it:
-                it.update(f(beta=beta, **kwds))
-            cost = it.y
+        beta_start = max(cost_gsa["beta"] - ceil(0.10 * cost_gsa["beta"]), 40)
+        beta_stop = max(cost_gsa["beta"] + ceil(0.20 * cost_gsa["beta"]), 40)
+        cost = None
+        if warm_start is not None:
+            cost = _bracket_minimum(
+                "usvp.beta_warm", partial(f, **kwds), warm_start["beta"], beta_start, beta_stop
+            )
+        if cost is None:
+            with minimizer("usvp.beta", beta_start, beta_stop) as it:
+                for beta in it:
+                    it.update(f(beta=beta, **kwds))
+                cost = it.y
 
         Logging.log("usvp", log_level, f"Opt-β: {repr(cost)}")
 
         if cost and optimize_d:
             # step 2. find d
-            with local_minimum(params.n, stop=cost["d"] + 1) as it:
+            with minimizer("usvp.d", params.n, stop=cost["d"] + 1) as it:
                 for d in it:
                     it.update(f(d=d, beta=cost["beta"], **kwds))
                 cost = it.y
@@ -402,23 +440,22 @@ class PrimalHybrid:
         babai: bool = True,
         mitm: bool = True,
         optimize_d=True,
+        warm_start=None,
         log_level=5,
         **kwds,
     ):
         """
         This function optimizes costs for a fixed guessing dimension ζ.
-        """
 
-        # step 0. establish baseline
-        baseline_cost = primal_usvp(
-            params,
-            red_shape_model=red_shape_model,
-            red_cost_model=red_cost_model,
-            optimize_d=False,
-            log_level=log_level + 1,
-            **kwds,
-        )
-        Logging.log("bdd", log_level, f"H0: {repr(baseline_cost)}")
+        :param warm_start: Optimum for a neighbouring instance, e.g. ``n - 1``, to seed the search.
+
+        When ``warm_start`` is given, we only search for β in a small bracket around the previous
+        optimum, capped at the β of the baseline like the full search, and for the baseline in a bracket
+        around the previous baseline, which the result stores as ``baseline``. We fall back to the full
+        search if an optimum lands on the edge of a bracket. d is always searched in full. Neither search
+        is exact, the cost is not unimodal in β, so for some instances the two differ by a few hundredths
+        of a bit. ``Benchmarks.py`` compares the number of evaluations with and without warm starts.
+        """
 
         f = partial(
             cls.cost,
@@ -432,22 +469,60 @@ class PrimalHybrid:
             **kwds,
         )
 
+        # the full search over β reuses the evaluations of a failed warm start
+        beta_cache = {}
+
+        # step 0. establish baseline, warm-started from the baseline of the neighbouring instance
+        baseline_cost = primal_usvp(
+            params,
+            red_shape_model=red_shape_model,
+            red_cost_model=red_cost_model,
+            optimize_d=False,
+            warm_start=None if warm_start is None else warm_start.get("baseline", None),
+            log_level=log_level + 1,
+            **kwds,
+        )
+        Logging.log("bdd", log_level, f"H0: {repr(baseline_cost)}")
+
+        warm = warm_start is not None and warm_start.get("beta", None) is not None
+
         # step 1. optimize β
-        with local_minimum(
-            40, baseline_cost["beta"] + 1, precision=2, log_level=log_level + 1
-        ) as it:
-            for beta in it:
-                it.update(f(beta))
-            for beta in it.neighborhood:
-                it.update(f(beta))
-            cost = it.y
+        cost = None
+        if warm:
+            cost = _bracket_minimum(
+                "hybrid.beta_warm",
+                f,
+                warm_start["beta"],
+                40,
+                baseline_cost["beta"] + 1,
+                log_level=log_level + 1,
+                cache=beta_cache,
+            )
+            if cost is None:
+                Logging.log("bdd", log_level, "Warm start of β failed, falling back to full search.")
+        if cost is None:
+            with minimizer(
+                "hybrid.beta",
+                40,
+                baseline_cost["beta"] + 1,
+                precision=2,
+                log_level=log_level + 1,
+                cache=beta_cache,
+            ) as it:
+                for beta in it:
+                    it.update(f(beta))
+                for beta in it.neighborhood:
+                    it.update(f(beta))
+                cost = it.y
 
         Logging.log("bdd", log_level, f"H1: {repr(cost)}")
 
         # step 2. optimize d
         if cost and cost.get("tag", "XXX") != "usvp" and optimize_d:
-            with local_minimum(
-                params.n, cost["d"] + cost["zeta"] + 1, log_level=log_level + 1
+            # no warm start: the cost is a sawtooth in d, so a bracket around the previous optimum
+            # can hold a local minimum that is not the one the full search finds
+            with minimizer(
+                "hybrid.d", params.n, cost["d"] + cost["zeta"] + 1, log_level=log_level + 1
             ) as it:
                 for d in it:
                     it.update(f(beta=cost["beta"], d=d))
@@ -456,6 +531,7 @@ class PrimalHybrid:
 
         if cost is None:
             return Cost(rop=oo)
+        cost["baseline"] = baseline_cost
         return cost
 
     def __call__(
@@ -466,6 +542,7 @@ class PrimalHybrid:
         mitm: bool = True,
         red_shape_model=red_shape_model_default,
         red_cost_model=red_cost_model_default,
+        warm_start=None,
         log_level=1,
         **kwds,
     ):
@@ -476,6 +553,8 @@ class PrimalHybrid:
         :param zeta: Guessing dimension ζ ≥ 0.
         :param babai: Insist on Babai's algorithm for finding close vectors.
         :param mitm: Simulate MITM approach (√ of search space).
+        :param warm_start: Cost of a neighbouring instance to seed the search for a fixed ζ, see
+            ``cost_zeta``.
         :return: A cost dictionary
 
         The returned cost dictionary has the following entries:
@@ -546,7 +625,7 @@ class PrimalHybrid:
         )
 
         if zeta is None:
-            with local_minimum(0, params.n, log_level=log_level) as it:
+            with minimizer("hybrid.zeta", 0, params.n, log_level=log_level) as it:
                 for zeta in it:
                     it.update(
                         f(
@@ -558,7 +637,7 @@ class PrimalHybrid:
             # TODO: this should not be required
             cost = min(it.y, f(0, optimize_d=False, **kwds))
         else:
-            cost = f(zeta=zeta)
+            cost = f(zeta=zeta, warm_start=warm_start)
 
         cost["tag"] = tag
         cost["problem"] = params
@@ -586,6 +665,7 @@ def primal_bdd(
     params: LWEParameters,
     red_shape_model=red_shape_model_default,
     red_cost_model=red_cost_model_default,
+    warm_start=None,
     log_level=1,
     **kwds,
 ):
@@ -595,6 +675,8 @@ def primal_bdd(
     :param params: LWE parameters.
     :param red_cost_model: How to cost lattice reduction
     :param red_shape_model: How to model the shape of a reduced basis
+    :param warm_start: Cost of a neighbouring instance, e.g. the previous ``n`` of a sweep, to seed
+        the search for β.
 
     """
 
@@ -605,6 +687,7 @@ def primal_bdd(
         babai=False,
         red_shape_model=red_shape_model,
         red_cost_model=red_cost_model,
+        warm_start=warm_start,
         log_level=log_level,
         **kwds,
     )
@@ -3,7 +3,7 @@
 Cost estimates for lattice redution.
 """
 
-from sage.all import ZZ, RR, pi, e, find_root, ceil, floor, log, oo, round, sqrt
+from sage.all import ZZ, RR, pi, e, find_root, ceil, floor, log, oo, round, sqrt, cached_function
 from scipy.optimize import newton
 
 
@@ -75,6 +75,7 @@ class ReductionCost:
             return RR(beta / (2 * pi * e) * (pi * beta) ** (1 / beta)) ** (1 / (2 * (beta - 1)))
 
     @staticmethod
+    @cached_function
     def delta(beta):
         """
         Compute root-Hermite factor δ from block size β.
@@ -1,11 +1,30 @@
-from multiprocessing import Pool
+import atexit
+import copy
+import logging
+import multiprocessing
+import os
+import signal
+import threading
 from functools import partial
 
 from sage.all import ceil, floor, oo
 
+from .cost import Cost
 from .io import Logging
 
 
+# evaluation counts of all finished searches, by call site and optimizer, see ``evaluation_counts()``
+_evaluation_counts = {}
+
+
+def _speculative_evaluate(f, param, impermanents, x):
+    """
+    Evaluate ``f`` at ``x`` in a worker, with the impermanent entries of the caller registered.
+    """
+    Cost.register_impermanent(impermanents)
+    return f(x) if param is None else f(**{param: x})
+
+
 class local_minimum_base:
     """
     An iterator context for finding a local minimum using binary search.
@@ -23,6 +42,7 @@ class local_minimum_base:
         smallerf=lambda x, best: x <= best,
         suppress_bounds_warning=False,
         log_level=5,
+        cache=None,
     ):
         """
         Create a fresh local minimum search context.
@@ -31,6 +51,8 @@ class local_minimum_base:
         :param stop:  end point (exclusive)
         :param smallerf: a function to decide if ``lhs`` is smaller than ``rhs``.
         :param suppress_bounds_warning: do not warn if a boundary is picked as optimal
+        :param cache: a dictionary of known results keyed by ``x``, to share evaluations between searches
+            over the same function
 
         """
 
@@ -50,32 +72,72 @@ class local_minimum_base:
         self._next_x = self._stop
         self._best = (None, None)
         self._all_x = set()
+        # results of all evaluations, keyed by the ``x`` handed out to the caller
+        self._cache = {} if cache is None else cache
+        self._last_key = None
+        self.hits = 0
+        self.misses = 0
+        self.speculated = 0
+        # the call site, set by ``minimizer()``
+        self.site = None
 
     def __enter__(self):
         """ """
         return self
 
-    def __exit__(self, type, value, traceback):
+    def __exit__(self, type_, value, traceback):
         """ """
-        pass
+        Logging.log("bins", self._log_level + 1, f"evaluations: {self.misses}, cached: {self.hits}")
+        counts = _evaluation_counts.setdefault(
+            (self.site, type(self).__name__), {"searches": 0, "evaluated": 0, "cached": 0, "speculated": 0}
+        )
+        counts["searches"] += 1
+        counts["evaluated"] += self.misses
+        counts["cached"] += self.hits
+        counts["speculated"] += self.speculated
 
     def __iter__(self):
         """ """
         return self
 
-    def __next__(self):
-        abort = False
+    def _key(self, x):
+        """
+        The ``x`` handed out to the caller for the internal ``x``.
+        """
+        return x
+
+    def _replay(self, key):
+        """
+        Feed the cached result for ``key`` to ``update()`` instead of handing ``key`` out again.
+
+        :return: ``True`` if there was a cached result.
+        """
+        if key not in self._cache:
+            self._last_key = key
+            return False
+        self.hits += 1
+        self._last_key = None
+        self.update(self._cache[key])
+        return True
+
+    def _peek(self):
+        """
+        The next (internal) ``x`` or ``None`` if the search stops.
+        """
         if self._next_x is None:
-            abort = True  # we're told to abort
+            return None  # we're told to abort
         elif self._next_x in self._all_x:
-            abort = True  # we're looping
+            return None  # we're looping
         elif self._next_x < self._initial_bounds[0] or self._initial_bounds[1] < self._next_x:
-            abort = True  # we're stepping out of bounds
+            return None  # we're stepping out of bounds
+        return self._next_x
 
-        if not abort:
+    def __next__(self):
+        while self._peek() is not None:
             self._last_x = self._next_x
             self._next_x = None
-            return self._last_x
+            if not self._replay(self._key(self._last_x)):
+                return self._last_x
 
         if self._best[0] in self._initial_bounds and not self._suppress_bounds_warning:
             # We warn the user if the optimal solution is at the edge and thus possibly not optimal.
@@ -108,21 +170,45 @@ class local_minimum_base:
             >>> binary_search(f, 10, 30, "x")
             rop: 1
 
+        Results are cached by ``x``, the neighborhood pass and searches sharing a ``cache`` do not evaluate
+        a point twice::
+
+            >>> from estimator.util import local_minimum
+            >>> with local_minimum(0, 100, precision=4) as it:
+            ...     for x in it:
+            ...         it.update((x - 41)**2)
+            ...     for x in it.neighborhood:
+            ...         it.update((x - 41)**2)
+            >>> it.y, it.misses, it.hits
+            (0, 12, 2)
+
         """
 
         Logging.log("bins", self._log_level, f"({self._last_x}, {repr(res)})")
 
+        if self._last_key is not None:
+            self.misses += 1
+            self._cache[self._last_key] = res
+            self._last_key = None
+
         self._all_x.add(self._last_x)
 
         # We got nothing yet
         if self._best[0] is None:
             self._best = self._last_x, res
 
-        # We found something better
-        if res is not False and self._smallerf(res, self._best[1]):
-            # store it
+        better = res is not False and self._smallerf(res, self._best[1])
+        if better:
             self._best = self._last_x, res
+        self._step(better)
 
+    def _step(self, better):
+        """
+        Pick the next ``x`` depending on whether the last one was ``better`` than the best so far.
+        """
+
+        # We found something better
+        if better:
             # if it's a result of a long jump figure out the next direction
             if abs(self._direction) != 1:
                 self._direction = -1
@@ -157,6 +243,58 @@ class local_minimum_base:
         if self._next_x == self._last_x:
             self._next_x = None
 
+    def _frontier(self, depth):
+        """
+        The points without a cached result that the search may ask for within the next ``depth`` steps
+        after the pending one, whatever the results are.
+        """
+        keys = []
+        states = [self]
+        for _ in range(depth):
+            successors = []
+            for state in states:
+                for better in (True, False):
+                    successor = copy.copy(state)
+                    successor._all_x = state._all_x | {state._last_x}
+                    successor._step(better)
+                    x = successor._peek()
+                    if x is None:
+                        continue
+                    successor._last_x, successor._next_x = x, None
+                    key = self._key(x)
+                    if key not in self._cache and key not in keys:
+                        keys.append(key)
+                    successors.append(successor)
+            states = successors
+        return keys
+
+    def search(self, f, pool=None, depth=2, param=None):
+        """
+        Run the search on ``f``, evaluating the points the search may ask for next speculatively on ``pool``.
+
+        Every step evaluates the pending point together with the points of the next ``depth`` steps for
+        all possible outcomes, in parallel. The results are fed to ``update()`` in the order of the
+        sequential search, so the result is the same as without ``pool``.
+
+        :param f: the function to minimize, called as ``f(x)`` or ``f(**{param: x})``
+        :param pool: a ``multiprocessing.Pool`` or anything else with an order preserving ``map``
+        :param depth: the number of steps to look ahead, up to ``2^(depth+1) - 1`` points per step
+        :param param: the name of the keyword argument of ``f`` to search over
+
+        """
+        evaluate = partial(_speculative_evaluate, f, param, dict(Cost.impermanents))
+        for x in self:
+            if pool is None:
+                self.update(evaluate(x))
+                continue
+            keys = [self._key(self._last_x)] + self._frontier(depth)
+            results = pool.map(evaluate, keys)
+            for key, res in zip(keys[1:], results[1:]):
+                self._cache[key] = res
+            self.speculated += len(keys) - 1
+            self.update(results[0])
+        return self.y
+
 
 class local_minimum(local_minimum_base):
     """
@@ -180,6 +318,7 @@ class local_minimum(local_minimum_base):
         smallerf=lambda x, best: x <= best,
         suppress_bounds_warning=False,
         log_level=5,
+        cache=None,
     ):
         """
         Create a fresh local minimum search context.
@@ -189,13 +328,18 @@ class local_minimum(local_minimum_base):
         :param precision: only consider every ``precision``-th value in the main loop
         :param smallerf: a function to decide if ``lhs`` is smaller than ``rhs``.
         :param suppress_bounds_warning: do not warn if a boundary is picked as optimal
+        :param cache: a dictionary of known results keyed by ``x``, to share evaluations between searches
+            over the same function
 
         """
         self._precision = precision
         self._orig_bounds = (start, stop)
         start = ceil(start / precision)
         stop = floor(stop / precision)
-        local_minimum_base.__init__(self, start, stop, smallerf, suppress_bounds_warning, log_level)
+        local_minimum_base.__init__(self, start, stop, smallerf, suppress_bounds_warning, log_level, cache)
+
+    def _key(self, x):
+        return x * self._precision
 
     def __next__(self):
         x = local_minimum_base.__next__(self)
@@ -208,13 +352,196 @@ class local_minimum(local_minimum_base):
     @property
     def neighborhood(self):
         """
-        An iterator over the neighborhood of the currently best value.
+        An iterator over the neighborhood of the currently best value. Points with a cached result are
+        not handed out again, their result is fed to ``update()`` directly.
         """
 
         start, stop = self._orig_bounds
 
         for x in range(max(start, self.x - self._precision), min(stop, self.x + self._precision)):
-            yield x
+            if not self._replay(x):
+                yield x
+
+    def search(self, f, pool=None, depth=2, param=None, neighborhood=False):
+        """
+        Run the search on ``f`` as ``local_minimum_base.search()``. With ``neighborhood``, also search the
+        neighborhood of the result, all of it evaluated at once on ``pool``.
+        """
+        local_minimum_base.search(self, f, pool, depth, param)
+        if neighborhood:
+            evaluate = partial(_speculative_evaluate, f, param, dict(Cost.impermanents))
+            start, stop = self._orig_bounds
+            keys = [
+                x
+                for x in range(max(start, self.x - self._precision), min(stop, self.x + self._precision))
+                if x not in self._cache
+            ]
+            if pool is not None:
+                self._cache.update(zip(keys, pool.map(evaluate, keys)))
+                self.speculated += len(keys)
+            for x in self.neighborhood:
+                self.update(evaluate(x))
+        return self.y
+
+
+class fibonacci_search(local_minimum):
+    """
+    An iterator context for finding a minimum using Fibonacci search, with the interface of
+    ``local_minimum``.
+
+    The search keeps a bracket around the best point so far, whose length is a Fibonacci number, and
+    probes the mirror image of the best point in the bracket. Whatever the result, the bracket shrinks
+    to the next smaller Fibonacci number, so a range of ``N`` points takes at most ``log_φ(N) + 1``
+    evaluations, plus the neighborhood with ``precision > 1``. For unimodal functions this finds the
+    minimum, otherwise some local minimum.
+
+    EXAMPLE::
+
+        >>> from estimator.util import fibonacci_search
+        >>> with fibonacci_search(0, 1000) as it:
+        ...     for x in it:
+        ...         it.update((x - 641)**2)
+        >>> it.x, it.y, it.misses
+        (641, 0, 15)
+
+    """
+
+    def __init__(
+        self,
+        start,
+        stop,
+        precision=1,
+        smallerf=lambda x, best: x <= best,
+        suppress_bounds_warning=False,
+        log_level=5,
+        cache=None,
+    ):
+        """
+        Create a fresh Fibonacci search context, see ``local_minimum`` for the parameters.
+        """
+        if stop == oo:
+            raise ValueError("Fibonacci search needs a finite range.")
+        local_minimum.__init__(self, start, stop, precision, smallerf, suppress_bounds_warning, log_level, cache)
+
+        start, stop = self._initial_bounds
+        fib = [1, 1, 2]
+        while fib[-1] < stop - start + 2:
+            fib.append(fib[-1] + fib[-2])
+        # the bracket (a, b) without its ends and the best point in it
+        self._a, self._b = start - 1, start - 1 + fib[-1]
+        self._center = None
+        self._next_x = self._a + fib[-3]
+
+    def _step(self, better):
+        """
+        Shrink the bracket depending on whether the last point was ``better`` than the best so far and
+        pick the next point.
+        """
+        if self._center is None:
+            self._center = self._last_x
+        elif better:
+            if self._last_x > self._center:
+                self._a = self._center
+            else:
+                self._b = self._center
+            self._center = self._last_x
+        else:
+            if self._last_x > self._center:
+                self._b = self._last_x
+            else:
+                self._a = self._last_x
+
+        self._next_x = None
+        while self._b - self._a > 2:
+            x = self._a + self._b - self._center
+            if x <= self._initial_bounds[1]:
+                self._next_x = x
+                break
+            # beyond the range, i.e. no better
+            self._b = x
+
+
+# the optimizers ``minimizer()`` can pick
+class linear_search(local_minimum_base):
+    """
+    An iterator context that evaluates every point of a (small) range, with the interface of
+    ``local_minimum``. Unlike the other searches it finds the minimum of functions that are not unimodal.
+
+    EXAMPLE::
+
+        >>> from estimator.util import linear_search
+        >>> f = lambda x: [3, 1, 2, 0, 4][x]
+        >>> with linear_search(0, 5) as it:
+        ...     for x in it:
+        ...         it.update(f(x))
+        >>> it.x, it.y, it.misses
+        (3, 0, 5)
+
+    """
+
+    def __init__(self, start, stop, smallerf=lambda x, best: x <= best, suppress_bounds_warning=False, **kwds):
+        local_minimum_base.__init__(self, start, stop, smallerf, suppress_bounds_warning, **kwds)
+        self._next_x = self._start
+
+    def _step(self, better):
+        self._next_x = self._last_x + 1
+
+    @property
+    def neighborhood(self):
+        """
+        Every point has been evaluated already.
+        """
+        return iter(())
+
+
+OPTIMIZERS = {"local_minimum": local_minimum, "fibonacci": fibonacci_search}
+
+
+def minimizer(site, *args, **kwds):
+    """
+    A search context for the call site ``site``, e.g. ``"dual_hybrid.zeta"``, with the optimizer selected
+    for it in ``conf.optimizers`` or with ``conf.optimizer`` otherwise. The arguments are passed on to the
+    optimizer, see ``local_minimum``.
+
+    EXAMPLE::
+
+        >>> from estimator import conf
+        >>> from estimator.util import minimizer
+        >>> conf.optimizers["example"] = "fibonacci"
+        >>> type(minimizer("example", 0, 100)).__name__, type(minimizer("other", 0, 100)).__name__
+        ('fibonacci_search', 'local_minimum')
+        >>> del conf.optimizers["example"]
+
+    """
+    from . import conf
+
+    it = OPTIMIZERS[conf.optimizers.get(site, conf.optimizer)](*args, **kwds)
+    it.site = site
+    return it
+
+
+def evaluation_counts(reset=False):
+    """
+    The number of searches, function evaluations, results replayed from the cache and speculative
+    evaluations of all searches finished in this process, by call site and optimizer. Searches run by
+    worker processes are counted there.
+
+    :param reset: start counting from zero again
+
+    EXAMPLE::
+
+        >>> from estimator import *
+        >>> from estimator.util import evaluation_counts
+        >>> _ = evaluation_counts(reset=True)
+        >>> _ = LWE.primal_usvp(Kyber512)
+        >>> evaluation_counts()[("usvp.beta_gsa", "local_minimum")]["searches"]
+        1
+
+    """
+    counts = {key: dict(value) for key, value in _evaluation_counts.items()}
+    if reset:
+        _evaluation_counts.clear()
+    return counts
 
 
 class early_abort_range:
@@ -325,18 +652,112 @@ def binary_search(
         return it.y
 
 
-def _batch_estimatef(f, x, log_level=0, f_repr=None, catch_exceptions=True):
+# process pools kept alive between calls, by number of processes
+_worker_pools = {}
+
+
+def warm_up():
+    """
+    Import Sage and all attacks, which creates the reduction cost model instances, and fill the caches
+    shared by all estimates, i.e. δ for every block size. After this the first estimate in a process is
+    not slower than the ones after it.
+    """
+    import sage.all  # noqa: F401
+    from . import lwe  # noqa: F401
+    from .reduction import RC
+
+    for beta in range(2, 1025):
+        RC.delta(beta)
+
+
+def worker_pool(jobs=None):
+    """
+    A pool of ``jobs`` processes that is kept alive and reused by later calls with the same ``jobs``,
+    so repeated parallel estimates do not pay for starting processes every time. It is shared by
+    ``batch_estimate``, ``LWE.estimate``, ``LWE.estimate.rough`` and ``dual_hybrid``, which run
+    sequentially inside a worker, see ``in_worker()``.
+
+    Every worker is warmed up by ``warm_up()`` before it takes a task. This process is warmed up
+    first, so with the ``fork`` start method the workers inherit the imports and caches, and with
+    ``forkserver`` the server preloads Sage and the estimator.
+
+    :param jobs: number of processes (default: all cores)
+
+    """
+    if jobs is None:
+        jobs = os.cpu_count()
+    pool = _worker_pools.get(jobs)
+    if pool is None:
+        warm_up()
+        context = multiprocessing.get_context()
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(["sage.all", "estimator"])
+        pool = _worker_pools[jobs] = context.Pool(jobs, initializer=warm_up)
+    return pool
+
+
+def in_worker():
+    """
+    Whether this process is a daemonic pool worker, which cannot start a ``worker_pool()`` of its own.
+    Parallel callers run sequentially there instead.
+    """
+    return multiprocessing.current_process().daemon
+
+
+@atexit.register
+def close_worker_pools():
+    """
+    Shut down all pools created by ``worker_pool()``.
+    """
+    while _worker_pools:
+        _, pool = _worker_pools.popitem()
+        pool.terminate()
+        pool.join()
+
+
+def _timeout(signum, frame):
+    raise TimeoutError("wall-clock timeout")
+
+
+def _disarm():
+    """
+    Stop the timer of ``_batch_estimatef``, which may go off while doing so.
+    """
     try:
-        y = f(x)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    except TimeoutError:
+        pass
+
+
+def _batch_estimatef(f, x, log_level=0, f_repr=None, catch_exceptions=True, timeout=None):
+    if f_repr is None:
+        f_repr = repr(f)
+
+    # SIGALRM interrupts ``f`` after ``timeout`` seconds, this is only possible in the main thread
+    alarm = (
+        timeout is not None
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if alarm:
+        handler = signal.signal(signal.SIGALRM, _timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # the timer is stopped before handling the result, a timeout that goes off before is a failure of ``f``
+        try:
+            y = f(x)
+        finally:
+            if alarm:
+                _disarm()
     except Exception as e:
         if catch_exceptions:
             print(f"Algorithm {f_repr} on {x} failed with {e}")
             return None
         else:
             raise e
-
-    if f_repr is None:
-        f_repr = repr(f)
+    finally:
+        if alarm:
+            signal.signal(signal.SIGALRM, handler)
 
     Logging.log("batch", log_level, f"f: {f_repr}")
     Logging.log("batch", log_level, f"x: {x}")
@@ -345,6 +766,18 @@ def _batch_estimatef(f, x, log_level=0, f_repr=None, catch_exceptions=True):
     return y
 
 
+def _batch_estimate_task(args):
+    """
+    Run one task of ``batch_estimate`` in a worker, with the logging levels and impermanent entries of
+    the caller, which may have changed since the worker was started.
+    """
+    i, levels, impermanents, task = args
+    for logger, level in levels.items():
+        logging.getLogger(logger).setLevel(level)
+    Cost.register_impermanent(impermanents)
+    return i, _batch_estimatef(*task)
+
+
 def f_name(f):
     try:
         return f.__name__
@@ -352,16 +785,7 @@ def f_name(f):
         return repr(f)
 
 
-def batch_estimate(params, algorithm, jobs=1, log_level=0, catch_exceptions=True, **kwds):
-    """
-
-    :param params: (List of) LWE parameters.
-    :param algorithm: (List of) algorithms.
-    :param jobs: Use multiple threads in parallel.
-    :param log_level:
-    :param catch_exceptions: When an estimate fails, just print a warning.
-
-    """
+def _batch_tasks(params, algorithm, log_level, catch_exceptions, timeout, kwds):
     from .lwe_parameters import LWEParameters
 
     if isinstance(params, LWEParameters):
@@ -375,22 +799,70 @@ def batch_estimate(params, algorithm, jobs=1, log_level=0, catch_exceptions=True
 
     for x in params:
         for f in algorithm:
-            tasks.append((partial(f, **kwds), x, log_level, f_name(f), catch_exceptions))
+            tasks.append((partial(f, **kwds), x, log_level, f_name(f), catch_exceptions, timeout))
 
-    if jobs == 1:
-        res = {}
-        for f, x, lvl, f_repr, catch_exceptions in tasks:
-            y = _batch_estimatef(f, x, lvl, f_repr, catch_exceptions)
-            res[f_repr, x] = y
+    return tasks
+
+
+def _batch_run(tasks, jobs):
+    # a nested estimate, e.g. ``LWE.estimate(..., jobs=4)`` inside ``batch_estimate``, runs in its worker
+    if jobs == 1 or in_worker():
+        for task in tasks:
+            yield task[3], task[1], _batch_estimatef(*task)
     else:
-        pool = Pool(jobs)
-        res = pool.starmap(_batch_estimatef, tasks)
-        res = dict([((f_repr, x), res[i]) for i, (f, x, _, f_repr) in enumerate(tasks)])
+        levels = {logger: logging.getLogger(logger).level for logger in Logging.loggers}
+        impermanents = dict(Cost.impermanents)
+        args = [(i, levels, impermanents, task) for i, task in enumerate(tasks)]
+        for i, y in worker_pool(jobs).imap_unordered(_batch_estimate_task, args):
+            yield tasks[i][3], tasks[i][1], y
+
+
+def batch_estimate_iter(params, algorithm, jobs=1, log_level=0, catch_exceptions=True, timeout=None, **kwds):
+    """
+    Run ``algorithm`` on ``params`` as ``batch_estimate()``, but yield ``(f_name(f), x, f(x))`` as soon as
+    an estimate is done, in the order they finish. ``f(x)`` is ``None`` if the estimate failed.
+
+    :param params: (List of) LWE parameters.
+    :param algorithm: (List of) algorithms.
+    :param jobs: Use multiple processes in parallel.
+    :param log_level:
+    :param catch_exceptions: When an estimate fails, just print a warning.
+    :param timeout: Abort every estimate after this many seconds of wall-clock time.
+
+    .. note :: With ``jobs > 1``, estimates still running when the iterator is abandoned keep their
+        process busy until they are done.
+
+    """
+    yield from _batch_run(_batch_tasks(params, algorithm, log_level, catch_exceptions, timeout, kwds), jobs)
+
+
+def batch_estimate(
+    params, algorithm, jobs=1, log_level=0, catch_exceptions=True, timeout=None, callback=None, **kwds
+):
+    """
+
+    :param params: (List of) LWE parameters.
+    :param algorithm: (List of) algorithms.
+    :param jobs: Use multiple processes in parallel, the pool is reused by later calls.
+    :param log_level:
+    :param catch_exceptions: When an estimate fails, just print a warning.
+    :param timeout: Abort every estimate after this many seconds of wall-clock time, counted as a
+        failure.
+    :param callback: Called as ``callback(f_name(f), x, f(x))`` as soon as an estimate is done.
+
+    """
+    tasks = _batch_tasks(params, algorithm, log_level, catch_exceptions, timeout, kwds)
+
+    res = {}
+    for f_repr, x, y in _batch_run(tasks, jobs):
+        if callback is not None:
+            callback(f_repr, x, y)
+        res[f_repr, x] = y
 
     ret = dict()
-    for f, x in res:
+    for _, x, _, f_repr, _, _ in tasks:
         ret[x] = ret.get(x, dict())
-        if res[f, x] is not None:
-            ret[x][f] = res[f, x]
+        if res[f_repr, x] is not None:
+            ret[x][f_repr] = res[f_repr, x]
 
     return ret